@@ -14,8 +14,67 @@
 ##########################################################################################################################################
 
 from os import name
+from collections import namedtuple, OrderedDict
 import struct
 
+##########################################################################################################################################
+#                                                     Format-Descriptor Definition                                                       #
+##########################################################################################################################################
+
+#   Every "_format_*" of the Xcom_API-Class is an immutable descriptor. The first two elements are the format-id and the length in
+#   bytes like in the SCOM-specification, so "data_format[1]" keeps working. The descriptor also carries a precompiled little-endian
+#   "struct.Struct" and the limits, which are checked before a value is encoded or after a value is decoded.
+
+class Xcom_Format(namedtuple('Xcom_Format', ['id', 'length', 'codec', 'value_type', 'minimum', 'maximum',
+                                                   'single_bit', 'type_text'])):
+
+    """
+    ### Description:
+    Immutable descriptor of a SCOM data-format. **<id>** and **<length>** are the values of the SCOM-specification, **<codec>** is
+    a precompiled little-endian **struct.Struct**, **<value_type>** is **int** or **float**, **<minimum>**/**<maximum>** are the
+    allowed range of the value, **<single_bit>** marks the enum-formats (only one bit may be set) and **<type_text>** is the name
+    used in the error-messages.
+
+    ### Example-Code:
+
+    ```>>> Xcom_API._format_float[1]
+        4
+    >>> Xcom_API._format_float.codec.pack(12.0)
+        b'\\x00\\x00@A'
+    """
+
+    __slots__ = ()
+
+    def encode(self, property_data):
+
+        """
+        ### Description:
+        Checks the range/type of **<property_data>** and returns the packed value as **bytes** (LSB first). It raises a ValueError,
+        if the checks failed.
+        """
+
+        if not self.minimum<=property_data<=self.maximum or not isinstance(property_data, self.value_type):
+            raise ValueError('Invalid \"property_data\" for the data_format of type \"' + self.type_text + '\"!')
+        if self.single_bit and property_data & (property_data - 1):
+            raise ValueError('Invalid \"property_data\" for the data_format of type \"' + self.type_text + '\"!')
+        return self.codec.pack(property_data)
+
+    def decode(self, byte_frame, offset = 0):
+
+        """
+        ### Description:
+        Unpacks the value at **<offset>** of **<byte_frame>** (**bytes**, **bytearray** or **memoryview**) and checks the range.
+        It raises a ValueError, if the checks failed.
+        """
+
+        try:
+            value = self.codec.unpack_from(byte_frame, offset)[0]
+        except struct.error:
+            raise ValueError('Invalid \"byte_frame\" for the data_format of type \"' + self.type_text + '\"!')
+        if self.value_type is int and not self.minimum<=value<=self.maximum:
+            raise ValueError('Invalid \"byte_frame\" for the data_format of type \"' + self.type_text + '\"!')
+        return value
+
 ##########################################################################################################################################
 #                                                     Class Definition & Description                                                     #
 ##########################################################################################################################################
@@ -142,16 +201,21 @@ class Xcom_API():
     #                                                  Protected-Attributes-Format                                                   #
     ##################################################################################################################################
 
-    _format_bool                          = [1,1]
-    _format_format                        = [2,2]
-    _format_short_int                     = [3,2]
-    _format_enum                          = [4,2]
-    _format_short_enum                    = [5,2]
-    _format_long_enum                     = [6,4]
-    _format_error                         = [7,2]
-    _format_int32                         = [8,4]
-    _format_float                         = [9,4]
-    _format_byte                          = [10,1]
+    _format_bool        = Xcom_Format(1,  1, struct.Struct('<B'), int,   0,           1,          False, 'bool')
+    _format_format      = Xcom_Format(2,  2, struct.Struct('<h'), int,   -32768,      32767,      False, 'Format\" or \"Short Integer')
+    _format_short_int   = Xcom_Format(3,  2, struct.Struct('<h'), int,   -32768,      32767,      False, 'Format\" or \"Short Integer')
+    _format_enum        = Xcom_Format(4,  2, struct.Struct('<H'), int,   0,           32767,      True,  'Enum\" or \"Short Enum')
+    _format_short_enum  = Xcom_Format(5,  2, struct.Struct('<H'), int,   0,           32767,      True,  'Enum\" or \"Short Enum')
+    _format_long_enum   = Xcom_Format(6,  4, struct.Struct('<I'), int,   0,           2147483647, True,  'Long Enum')
+    _format_error       = Xcom_Format(7,  2, struct.Struct('<H'), int,   0,           0xFFFF,     False, 'Error')
+    _format_int32       = Xcom_Format(8,  4, struct.Struct('<i'), int,   -2147483648, 2147483647, False, 'INT32')
+    _format_float       = Xcom_Format(9,  4, struct.Struct('<f'), float, -2147483648, 2147483647, False, 'Float')
+    _format_byte        = Xcom_Format(10, 1, struct.Struct('<B'), int,   0,           255,        False, 'Byte')
+
+    #   Dispatch-Table of the formats, the key is the format-id.
+
+    __format_dict       = {f.id : f for f in (_format_bool, _format_format, _format_short_int, _format_enum, _format_short_enum,
+                                              _format_long_enum, _format_error, _format_int32, _format_float, _format_byte)}
 
     ##################################################################################################################################
     #                                                        Private-Level-QSP                                                       #
@@ -172,6 +236,12 @@ class Xcom_API():
     __data_flags                          = 0x00
     __data_frame                          = 0x0A
 
+    #   Precompiled structs of the Frame-Header (Start-Byte, Frame-Flags, Source, Destination, Data-Length) and of the Service-Part
+    #   (Data-Flags, Service_ID, Object_Type, Object_ID, Property_ID).
+
+    __header_struct                       = struct.Struct('<BBIIH')
+    __service_struct                      = struct.Struct('<BBhih')
+
     #   Dictionary of Error-Codes-Descriptions
 
     __error_code_dict   =  {0x0001  :   'INVALID_FRAME',
@@ -248,12 +318,12 @@ class Xcom_API():
     #   This Method is used with generating an object of the Xcom_API-Class. There are pre-defined arguments (CRC-Check, source-address, 
     #   destination-address) for this object, when you generate an objects without relevant arguments.
 
-    def __init__(self, crc = True, source = 1, destination = 101):
+    def __init__(self, crc = True, source = 1, destination = 101, read_frame_cache_size = 128):
 
         """
         ### Description:
         This Method is used with generating an object of the Xcom_API-Class. There are predefined arguments (CRC-Check, source-address,
-        destination-address) for this object, when you generate an objects without relevant arguments.
+        destination-address, size of the read-frame-cache) for this object, when you generate an objects without relevant arguments.
 
         ### Arguments:
         There are predefined arguments, which you can change:
@@ -267,6 +337,8 @@ class Xcom_API():
         +-+-+
         | **destination** | = 101 |
         +-+-+
+        | **read_frame_cache_size** | = 128 |
+        +-+-+
 
         ### Return-Value:
         This Method return an object of the Xcom_API-Class. 
@@ -300,12 +372,17 @@ class Xcom_API():
                 191<=destination<=193 or 300<=destination<=315 or 700<=destination<=715):
             raise ValueError('Destination-Address is out of range!')
 
+        # Check the argument "read_frame_cache_size". It raises a "ValueError" with a false type or a negative size.
+        elif not isinstance(read_frame_cache_size, int) or isinstance(read_frame_cache_size, bool) or read_frame_cache_size<0:
+            raise ValueError('Read-Frame-Cache-Size is not a positive \"int\"!')
+
         # If there is no error, the arguments will be stored in variables of the object. The object-counter will be increased.
         else:
             self.__dest                = destination
             self.__source              = source
             self.__crc                 = crc
-            self.__frame_check_done    = False
+            self.__read_frame_cache    = OrderedDict()
+            self.__read_frame_cache_size = read_frame_cache_size
             Xcom_API.__object_counter += 1
 
     ##################################################################################################################################
@@ -332,8 +409,6 @@ class Xcom_API():
             del self.__source
         if hasattr(self,'__dest'):
             del self.__dest
-        if hasattr(self,'__frame_check_done'):
-            del self.__frame_check_done
         Xcom_API.__object_counter -= 1
 
 
@@ -494,16 +569,18 @@ class Xcom_API():
     #                                                       Private-Methods                                                          #
     ##################################################################################################################################
 
-    #   This Method calculate the CRC-Values of a Frame. It returns the CRC-Values in a list or bytearray.
+    #   This Method calculate the CRC-Values of a Frame or of a range of a buffer. It returns the CRC-Values in a list.
 
-    def __calculate_checksum(byte_frame):
+    def __calculate_checksum(byte_frame, start = 0, end = None):
 
         """
         ### Description:
-        This Method calculate the CRC-Values of a Frame. It returns the CRC-Values in a **list**.
+        This Method calculate the CRC-Values of a Frame or of the range **<start>**:**<end>** of a buffer. It returns the CRC-Values 
+        in a **list**. Buffers (**bytes**, **bytearray**, **memoryview**) are read through a **memoryview**, so no copy is made.
 
         ### Arguments:
-        The **<byte_frame>** argument must be a type of **list** or **bytearray**.
+        The **<byte_frame>** argument must be a type of **list**, **bytes**, **bytearray** or **memoryview**. **<start>** and **<end>**
+        select the range like a slice, by default the whole **<byte_frame>** is used.
 
         ### Return-Value:
         This Method return a **list** of length two with the CRC-Values.
@@ -523,18 +600,56 @@ class Xcom_API():
             [0x6F, 0x71]
         """
 
+        # Select the range without a copy of the data.
+        if isinstance(byte_frame, (bytes, bytearray, memoryview)):
+            byte_frame = memoryview(byte_frame)[start:end]
+        elif start or end is not None:
+            byte_frame = byte_frame[start:end]
+
         # Define two Buffers for the CRC-Values.
         Buffer1 = 0xFF
         Buffer2 = 0
 
-        # Calculate the CRC-Values of a Frame.
-        for i in range(0,len(byte_frame)):
-            Buffer1 = (Buffer1 + byte_frame[i]) % 256
-            Buffer2 = (Buffer1 + Buffer2) % 256
-            
+        # Calculate the CRC-Values of a Frame. The modulo is done only once at the end.
+        for byte in byte_frame:
+            Buffer1 += byte
+            Buffer2 += Buffer1
+
         # Return the CRC-Values in a list.
-        return [Buffer1, Buffer2]
-    
+        return [Buffer1 % 256, Buffer2 % 256]
+
+    #   This Method returns the descriptor of a format. It accepts a descriptor or a list like [9,4] and raises a ValueError, if the
+    #   format is unknown.
+
+    def __get_format(data_format):
+
+        """
+        ### Description:
+        This Method returns the descriptor of a format. It accepts a descriptor or a list like [9,4] and raises a ValueError, if the
+        format is unknown.
+
+        ### Example-Code:
+
+        ```>>> Descriptor = Xcom_API._Xcom_API__get_format([9,4])
+        >>> Descriptor is Xcom_API._format_float
+            True
+        """
+
+        # A descriptor can be used directly.
+        if isinstance(data_format, Xcom_Format):
+            return data_format
+
+        # Look up the format-id in the Dispatch-Table and check the length.
+        try:
+            Buffer = Xcom_API.__format_dict[data_format[0]]
+            if len(data_format)==2 and data_format[1]==Buffer.length:
+                return Buffer
+        except (KeyError, IndexError, TypeError):
+            pass
+
+        # It raises an Error, if the argument "data_format" doesn't fit.
+        raise ValueError('data_format is unknown!')
+
     #   This Method generate a Byte-Frame of a Value depending of the format. It returns a list of Bytes, which are ordered in LSB to
     #   MSB.
 
@@ -591,149 +706,12 @@ class Xcom_API():
             [0x0, 0x0, 0x40, 0x41]
         """
 
-        # It checks the argument "data_format" for type "Bool" and check the range/type of "property_data", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it returns the list of the Byte-Frame.
-        if   data_format==Xcom_API._format_bool:
-            if not 0<=property_data<=1 or not (isinstance(property_data, int) or isinstance(property_data, bool)):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"bool\"!')
-            else:
-                # Return a list of the Byte-Frame.
-                if property_data == 0 or property_data == False:
-                    return [0]
-                else:
-                    return [1]
-
-        # It checks the argument "data_format" for type "Byte" and check the range/type of "property_data", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it returns the list of the Byte-Frame.
-        elif data_format==Xcom_API._format_byte:
-            if not 0<=property_data<256 or not isinstance(property_data, int):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"Byte\"!')
-            else:
-                # Return a list of the Byte-Frame.
-                return [property_data]
-        
-        # It checks the argument "data_format" for type "Error" and check the range/type of "property_data", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the list of the Byte-Frame.
-        elif data_format==Xcom_API._format_error:
-            if not 0<=property_data<=0x65535 or not isinstance(property_data, int):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"Error\"!')
-            else:
-                # Define a Buffer for calculating.
-                Buffer = hex(property_data)
-
-                # Calculate the Byte-Frame.
-                for i in range(0,data_format[1]*2-(len(Buffer)-2)):
-                    Buffer = Buffer[0:2]+str(0)+Buffer[2:]
-
-                # Return a list of the Byte-Frame.
-                return [int(Buffer[4:6],16),int(Buffer[2:4],16)]
-
-        # It checks the argument "data_format" for type "Format" or "Short Integer" and check the range/type of "property_data", 
-        # depending of the data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the list of 
-        # the Byte-Frame.
-        elif data_format==Xcom_API._format_format or data_format==Xcom_API._format_short_int:
-            if not -32768<=property_data<=32767 or not isinstance(property_data, int):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"Format\" or \"Short Integer\"!')
-            else:
-                # Calculate the Byte-Frame.
-                if property_data<0:
-                    # Define a Buffer for calculating.
-                    Buffer = hex(2**16 + property_data)
-
-                else:
-                    # Define a Buffer for calculating.
-                    Buffer = hex(property_data)
-
-                    for i in range(0,data_format[1]*2-(len(Buffer)-2)):
-                        Buffer = Buffer[0:2]+str(0)+Buffer[2:]
-
-                # Return a list of the Byte-Frame.
-                return [int(Buffer[4:6],16),int(Buffer[2:4],16)]
-
-        # It checks the argument "data_format" for type "Enum" or "Short Enum" and check the range/type of "property_data", depending 
-        # of the data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the list of the Byte-Frame. 
-        # Only one Bit can be set in data_format of type "Enum".
-        elif data_format==Xcom_API._format_enum or data_format==Xcom_API._format_short_enum:
-            if not 0<=property_data<=32767 or not isinstance(property_data, int):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"Enum\" or \"Short Enum\"!')
-            else:
-                check = False
-                for i in range(0,16):
-                    if (2**i==2**i&property_data) and check:
-                        raise ValueError('Invalid \"property_data\" for the data_format of type \"Enum\" or \"Short Enum\"!')
-                    elif 2**i==2**i&property_data:
-                        check = True
-
-                # Define a Buffer for calculating.
-                Buffer = hex(property_data)
-
-                # Calculate the Byte-Frame.
-                for i in range(0,data_format[1]*2-(len(Buffer)-2)):
-                    Buffer = Buffer[0:2]+str(0)+Buffer[2:]
-
-                # Return a list of the Byte-Frame.
-                return [int(Buffer[4:6],16),int(Buffer[2:4],16)]
-
-        # It checks the argument "data_format" for type "Long Enum" and check the range/type of "property_data", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the list of the Byte-Frame. 
-        # Only one Bit can be set in data_format of type "Enum".
-        elif data_format==Xcom_API._format_long_enum:
-            if not 0<=property_data<=2147483647 or not isinstance(property_data, int):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"Long Enum\"!')
-            else:
-                check = False
-                for i in range(0,32):
-                    if (2**i==2**i&property_data) and check:
-                        raise ValueError('Invalid \"property_data\" for the data_format of type \"Long Enum\"!')
-                    elif 2**i==2**i&property_data:
-                        check = True
-
-                # Define a Buffer for calculating.
-                Buffer = hex(property_data)
-
-                # Calculate the Byte-Frame.
-                for i in range(0,data_format[1]*2-(len(Buffer)-2)):
-                    Buffer = Buffer[0:2]+str(0)+Buffer[2:]
-
-                # Return a list of the Byte-Frame.
-                return [int(Buffer[8:10],16),int(Buffer[6:8],16),int(Buffer[4:6],16),int(Buffer[2:4],16)]
-
-        # It checks the argument "data_format" for type "INT32" and check the range/type of "property_data", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the list of the Byte-Frame.
-        elif data_format==Xcom_API._format_int32:
-            if not -2147483648<=property_data<=2147483647 or not isinstance(property_data, int):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"INT32\"!')
-            else:
-                # Calculate the Byte-Frame.
-                if property_data<0:
-                    # Define a Buffer for calculating.
-                    Buffer = hex(2**32 + property_data)
-
-                else:
-                    # Define a Buffer for calculating.
-                    Buffer = hex(property_data)
-                    
-                    for i in range(0,data_format[1]*2-(len(Buffer)-2)):
-                        Buffer = Buffer[0:2]+str(0)+Buffer[2:]
-                        
-                # Return a list of the Byte-Frame.
-                return [int(Buffer[8:10],16),int(Buffer[6:8],16),int(Buffer[4:6],16),int(Buffer[2:4],16)]
-
-        # It checks the argument "data_format" for type "Float" and check the range/type of "property_data", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the list of the Byte-Frame.
-        elif data_format==Xcom_API._format_float:
-            if not -2147483648<=property_data<=2147483647 or not isinstance(property_data, float):
-                raise ValueError('Invalid \"property_data\" for the data_format of type \"Float\"!')
-            else:
-                # Calculate the Byte-Frame.
-                Buffer = struct.pack("!f",property_data)
+        # Look up the descriptor of the format in the Dispatch-Table. It raises an ValueError if the argument "data_format" doesn't fit.
+        data_format = Xcom_API.__get_format(data_format)
 
-                # Return a list of the Byte-Frame.
-                return [Buffer[3],Buffer[2],Buffer[1],Buffer[0]]
-
-        # It raises an Error, if the argument "data_format" doesn't fit.
-        else:
-            raise ValueError('data_format is unknown!')
+        # Check the range/type of "property_data" with the descriptor. It raises an ValueError if the checks failed, otherwise it
+        # returns the list of the Byte-Frame.
+        return list(data_format.encode(property_data))
 
     #   This Method generate a Value of a Byte-Frame depending of the format. It returns the value as a integer/float.
     
@@ -790,151 +768,47 @@ class Xcom_API():
             12.0
         """
 
-        # It checks the argument "data_format" for type "Bool" and check the length/type of "byte_frame", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it returns the value of the Byte-Frame.
-        if   data_format==Xcom_API._format_bool:
-            if not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int) or not 0<=byte_frame[0]<=1:
-                raise ValueError('Invalid \"byte_frame\" for the data_format of type \"bool\"!')
-            else:
-                # Return the value of the Byte-Frame.
-                return byte_frame[0]
-            
-        # It checks the argument "data_format" for type "Byte" and check the length/type of "byte_frame", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it returns the value of the Byte-Frame.
-        elif data_format==Xcom_API._format_byte:
-            if not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int):
-                raise ValueError('Invalid \"byte_frame\" for the data_format of type \"Byte\"!')
-            else:
-                # Return the value of the Byte-Frame.
-                return byte_frame[0]
-        
-        # It checks the argument "data_format" for type "Error" and check the length/type of "byte_frame", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the value of the Byte-Frame.
-        elif data_format==Xcom_API._format_error:
-            if not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int) or not isinstance(byte_frame[1], int):
-                raise ValueError('Invalid \"byte_frame\" for the data_format of type \"Error\"!')
-            else:
-                # Define a Buffer.
-                Buffer = '0x'
-
-                # Calculate the value.
-                for i in range(0,data_format[1]):
-                    if len(hex(byte_frame[data_format[1]-1-i]))==4:
-                        Buffer = Buffer + hex(byte_frame[data_format[1]-1-i])[2:]
-                    else:
-                        Buffer = Buffer + '0' + hex(byte_frame[data_format[1]-1-i])[2:]
-
-                # Return the value of the Byte-Frame.
-                return int(Buffer,16)
-
-        # It checks the argument "data_format" for type "Format" or "Short Integer" and check the length/type of "byte_frame", depending 
-        # of the data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the value of the Byte-Frame.
-        elif data_format==Xcom_API._format_format or data_format==Xcom_API._format_short_int:
-            if not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int) or not isinstance(byte_frame[1], int):
-                raise ValueError('Invalid \"byte_frame\" for the data_format of type \"Format\" or \"Short Integer\"!')
-            else:
-                # Define a Buffer.
-                Buffer = '0x'
-
-                # Calculate the value.
-                for i in range(0,data_format[1]):
-                    if len(hex(byte_frame[data_format[1]-1-i]))==4:
-                        Buffer = Buffer + hex(byte_frame[data_format[1]-1-i])[2:]
-                    else:
-                        Buffer = Buffer + '0' + hex(byte_frame[data_format[1]-1-i])[2:]
-
-                # Return the value of the Byte-Frame.
-                if int(Buffer,16)<32768:
-                    return int(Buffer,16)
-                else:
-                    return (-65536 + int(Buffer,16))
-
-        # It checks the argument "data_format" for type "Enum" or "Short Enum" and check the length/type of "byte_frame", depending of the 
-        # data_format. It raises an ValueError if the checks failed, otherwise it calculate and returns the value of the Byte-Frame.
-        elif data_format==Xcom_API._format_enum or data_format==Xcom_API._format_short_enum:
-            if not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int) or not isinstance(byte_frame[1], int):
-                raise ValueError('Invalid \"byte_frame\" for the data_format of type \"Enum\" or \"Short Enum\"!')
-            else:
-                # Define a Buffer.
-                Buffer = '0x'
-
-                # Calculate the value.
-                for i in range(0,data_format[1]):
-                    if len(hex(byte_frame[data_format[1]-1-i]))==4:
-                        Buffer = Buffer + hex(byte_frame[data_format[1]-1-i])[2:]
-                    else:
-                        Buffer = Buffer + '0' + hex(byte_frame[data_format[1]-1-i])[2:]
-
-                # Return the value of the Byte-Frame.
-                if int(Buffer,16)<32768:
-                    return int(Buffer,16)
-                else:
-                    raise ValueError('Invalid \"byte_frame\" for the data_format of type \"Enum\" or \"Short Enum\"!')
-                
-        # It checks the argument "data_format" for type "Long Enum" and check the length/type of "byte_frame", depending of the data_format.
-        # It raises an ValueError if the checks failed, otherwise it calculate and returns the value of the Byte-Frame. 
-        elif data_format==Xcom_API._format_long_enum:
-            if (not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int) or not isinstance(byte_frame[1], int)  
-                or not isinstance(byte_frame[2], int) or not isinstance(byte_frame[3], int)):
-                raise ValueError('Invalid \"byte_frame" for the data_format of type \"Long Enum\"!')
-            else:
-                # Define a Buffer.
-                Buffer = '0x'
-
-                # Calculate the value.
-                for i in range(0,data_format[1]):
-                    if len(hex(byte_frame[data_format[1]-1-i]))==4:
-                        Buffer = Buffer + hex(byte_frame[data_format[1]-1-i])[2:]
-                    else:
-                        Buffer = Buffer + '0' + hex(byte_frame[data_format[1]-1-i])[2:]
-
-                # Return the value of the Byte-Frame.
-                if int(Buffer,16)<2147483648:
-                    return int(Buffer,16)
-                else:
-                    raise ValueError('Invalid \"byte_frame" for the data_format of type \"Long Enum\"!')
-
-        # It checks the argument "data_format" for type "INT32" and check the length/type of "byte_frame", depending of the data_format.
-        # It raises an ValueError if the checks failed, otherwise it calculate and returns the value of the Byte-Frame.
-        elif data_format==Xcom_API._format_int32:
-            if (not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int) or not isinstance(byte_frame[1], int)  
-                or not isinstance(byte_frame[2], int) or not isinstance(byte_frame[3], int)):
-                raise ValueError('Invalid \"byte_frame\" for the data_format of type \"INT32\"!')
-            else:
-                # Define a Buffer.
-                Buffer = '0x'
-
-                # Calculate the value.
-                for i in range(0,data_format[1]):
-                    if len(hex(byte_frame[data_format[1]-1-i]))==4:
-                        Buffer = Buffer + hex(byte_frame[data_format[1]-1-i])[2:]
-                    else:
-                        Buffer = Buffer + '0' + hex(byte_frame[data_format[1]-1-i])[2:]
-
-                # Return the value of the Byte-Frame.
-                if int(Buffer,16)<2147483648:
-                    return int(Buffer,16)
-                else:
-                    return (-4294967296 + int(Buffer,16))
-
-        # It checks the argument "data_format" for type "Float" and check the length/type of "byte_frame", depending of the data_format.
-        # It raises an ValueError if the checks failed, otherwise it calculate and returns the value of the Byte-Frame.
-        elif data_format==Xcom_API._format_float:
-            if (not len(byte_frame)==data_format[1] or not isinstance(byte_frame[0], int) or not isinstance(byte_frame[1], int)  
-                or not isinstance(byte_frame[2], int) or not isinstance(byte_frame[3], int)):
-                raise ValueError('Invalid \"byte_frame\" for the data_format of type \"Float\"!')
-            else:
-                # Define a Buffer.
-                Buffer = bytearray([byte_frame[3],byte_frame[2],byte_frame[1],byte_frame[0]])
+        # Look up the descriptor of the format in the Dispatch-Table. It raises an ValueError if the argument "data_format" doesn't fit.
+        data_format = Xcom_API.__get_format(data_format)
 
-                # Calculate and return the value of the Byte-Frame.
-                return struct.unpack("!f",Buffer)[0]     
+        # Check the length of "byte_frame". A list is converted to bytes, so that the precompiled struct can unpack it.
+        try:
+            if not len(byte_frame)==data_format.length:
+                raise ValueError
+            if not isinstance(byte_frame, (bytes, bytearray, memoryview)):
+                byte_frame = bytes(byte_frame)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid \"byte_frame\" for the data_format of type \"' + data_format.type_text + '\"!')
 
-        # It raises an Error, if the argument "format" doesn't fit.
-        else:
-            raise ValueError('data_format is unknown!')
+        # Calculate and return the value of the Byte-Frame. It raises an ValueError if the value is out of range.
+        return data_format.decode(byte_frame)
 
     
+    #   This Method packs the Service-Part of a Frame (Data-Flags, Service_ID, Object_Type, Object_ID, Property_ID) with the precompiled
+    #   struct. It returns the packed bytes.
+
+    def __pack_service(service_id, object_type, object_id, property_id):
+
+        """
+        ### Description:
+        This Method packs the Service-Part of a Frame (Data-Flags, Service_ID, Object_Type, Object_ID, Property_ID) with the
+        precompiled struct. It raises the same ValueError like the format-descriptors, if an argument doesn't fit.
+
+        ### Example-Code:
+
+        ```>>> Xcom_API._Xcom_API__pack_service(1, Xcom_API._object_type_info, 3000, Xcom_API._property_id_value)
+            b'\\x00\\x01\\x01\\x00\\xb8\\x0b\\x00\\x00\\x01\\x00'
+        """
+
+        try:
+            return Xcom_API.__service_struct.pack(Xcom_API.__data_flags, service_id, object_type, object_id, property_id)
+        except struct.error:
+            # Let the descriptors raise the matching ValueError.
+            Xcom_API._format_short_int.encode(object_type)
+            Xcom_API._format_int32.encode(object_id)
+            Xcom_API._format_short_int.encode(property_id)
+            raise
+
     #   This Method does a Frame-Check. It checks the startbyte, Frame-Length, the checksum and the response-flags. It returns a 
     #   boolean-value of the result.
 
@@ -968,56 +842,107 @@ class Xcom_API():
             True
         """
         
-        # Define Buffer for Frame_check.
-        Buffer = list(bytearray_of_frame)
-        
-        try:
-            # Check Start-Byte available  
-            if not Buffer[0]==0xAA:
-                raise ValueError('Can\'t find Start-Frame (0xAA)')
+        # Check the frame, it must fill the whole buffer.
+        return Xcom_API.__check_frame_at(self, bytearray_of_frame, None)>0
+
+    #   This Method does a Frame-Check of a frame, which starts at an offset of a receive-buffer. It returns the length of the frame.
+
+    def __check_frame_at(self, buffer, offset):
 
-            # Check checksum if activated and check Frame-Length
-            if self.__crc and len(Buffer)>=14:
-                # check Header-Checksum
-                if not Xcom_API.__calculate_checksum(Buffer[1:12])==Buffer[12:14]:
-                    raise ValueError('Header-Checksum wrong!')
+        """
+        ### Description:
+        This Method does a Frame-Check of a frame, which starts at **<offset>** of a receive-buffer. The buffer can hold several frames
+        back to back. It checks the startbyte, Frame-Length, the checksum and the response-flags through a **memoryview**, so no copy
+        of the buffer is made. It returns the length of the frame and raises a ValueError, if the check failed.
 
-                # check Frame-Length
-                if not len(Buffer)==(Xcom_API.__byte_frame_to_value(Buffer[10:12],Xcom_API._format_short_int) + 16):
-                    raise ValueError('Frame is not complete!')
+        ### Arguments:
+        The **<self>** argument must be an object. The **<buffer>** argument is a **bytes**, **bytearray**, **memoryview** or **list**.
+        If **<offset>** is **None**, the frame must start at the beginning and fill the whole buffer.
+
+        ### Return-Value:
+        This Method return an **int** with the length of the frame.
+        """
 
-                # check Data-Checksum 
-                if not Xcom_API.__calculate_checksum(Buffer[14:(len(Buffer)-2)])==Buffer[(len(Buffer)-2):len(Buffer)]:
-                    raise ValueError('Data-Checksum wrong!')
+        # Define a memoryview for the Frame-Check. Only a list has to be copied.
+        View = Xcom_API.__get_view(buffer)
+        Exact = offset is None
+        if Exact:
+            offset = 0
+        Available = len(View) - offset
 
-            elif not self.__crc and len(Buffer)>=14:
-                # check Frame-Length
-                if not len(Buffer)==(Xcom_API.__byte_frame_to_value(Buffer[10:12],Xcom_API._format_short_int) + 16):
-                    raise ValueError('Frame is not complete!')                
+        # Check Start-Byte available
+        if Available<1:
+            raise ValueError('Frame is not complete!')
+        if not View[offset]==0xAA:
+            raise ValueError('Can\'t find Start-Frame (0xAA)')
+        if Available<14:
+            raise ValueError('Frame is not complete!')
 
+        # check Header-Checksum if activated
+        if self.__crc and not Xcom_API.__calculate_checksum(View, offset+1, offset+12)==[View[offset+12], View[offset+13]]:
+            raise ValueError('Header-Checksum wrong!')
+
+        # check Frame-Length
+        Length = Xcom_API._format_short_int.codec.unpack_from(View, offset+10)[0] + 16
+        if Length<16 or Available<Length or (Exact and not Available==Length):
+            raise ValueError('Frame is not complete!')
+
+        # check Data-Checksum if activated
+        if self.__crc and not (Xcom_API.__calculate_checksum(View, offset+14, offset+Length-2)==
+                               [View[offset+Length-2], View[offset+Length-1]]):
+            raise ValueError('Data-Checksum wrong!')
+
+        # Check Response-Flags
+        if not View[offset+14]>0:
+            raise ValueError('Frame is not a Response-Frame!')
+
+        return Length
+
+    #   This Method returns a memoryview of a buffer. Only a list has to be copied.
+
+    def __get_view(buffer):
+
+        """
+        ### Description:
+        This Method returns a **memoryview** of a buffer. **bytes**, **bytearray** and **memoryview** are not copied, only a **list**
+        is converted to **bytes** first.
+        """
+
+        if not isinstance(buffer, (bytes, bytearray, memoryview)):
+            buffer = bytes(buffer)
+        return memoryview(buffer)
+
+    #   This Method decodes a checked frame. It returns a List with the result of the returned Data and the Data itself.
+
+    def __decode_frame(frame, data_format):
+
+        """
+        ### Description:
+        This Method decodes a checked frame, **<frame>** is a **memoryview** of exactly one frame. It returns a **list** like
+        get_data_from_frame_ext().
+        """
+
+        # Check Frame for an Error and return the value.
+        if frame[14] == 2:
+            # Check if property_data available
+            if len(frame) == 26:
+                return [False,'value_set']
             else:
-                raise ValueError('Frame is not complete!')
-            
-            # Check Response-Flags
-            if not Buffer[14]>0:                      
-                raise ValueError('Frame is not a Response-Frame!')
-
-            return True
-               
-        except IndexError:
-            raise ValueError('Frame is not complete!') 
-        
+                return [False, Xcom_API.__get_format(data_format).decode(frame, 24)]
+        else:
+            return [True, Xcom_API._format_error.decode(frame, 24)]
+
     ##################################################################################################################################
     #                                                     Public-Methods                                                             #
     ##################################################################################################################################
 
-    #   This method is used to generate a Byte-Frame for a 'read'-instruction. It Returns a bytearray.  
+    #   This method is used to generate a Byte-Frame for a 'read'-instruction. It Returns immutable bytes from the read-frame-cache.  
     
     def get_read_frame_ext(self, object_type, object_id, property_id):
 
         """
         ### Description:
-        This method is used to generate a Byte-Frame for a 'read'-instruction. It Returns a bytearray.  
+        This method is used to generate a Byte-Frame for a 'read'-instruction. It Returns immutable bytes from the read-frame-cache.  
 
         ### Arguments:
         The **<self>** argument is pointing to the object, which calls the method.
@@ -1077,7 +1002,7 @@ class Xcom_API():
         +-+-+
 
         ### Return-Value:
-        This Method return a **bytearray** of the frame.
+        This Method return the frame as **bytes**.
 
         ### Example-Code:
 
@@ -1085,50 +1010,40 @@ class Xcom_API():
         >>> input_current = 3116
         >>> Byte_frame = Object.get_read_frame_ext(Xcom_API._object_type_info, input_current, Xcom_API._property_id_value)
         >>> Byte_frame
-            bytearray(b'\\xAA\\x00\\x01\\x00\\x00\\x00\\x65\\x00\\x00\\x00\\x0A\\x00\\x6F\\x71\\x00\\x01\\x01\\x00\\x2C\\x0C\\x00\\x00\\x01\\x00\\x3A\\x4D')
+            b'\\xAA\\x00\\x01\\x00\\x00\\x00\\x65\\x00\\x00\\x00\\x0A\\x00\\x6F\\x71\\x00\\x01\\x01\\x00\\x2C\\x0C\\x00\\x00\\x01\\x00\\x3A\\x4D'
         """
         
-        # Create Buffer
-        Buffer = []
-        
-        # Append Buffer with Start-Byte.
-        Buffer.append(Xcom_API.__start_byte)
-        
-        # Append Buffer with Frame-Flags.
-        Buffer.append(Xcom_API.__frame_flags)
-        
-        # Extend Buffer with Source-Address.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(self.__source,Xcom_API._format_int32))
-        
-        # Extend Buffer with Destination-Address.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(self.__dest,Xcom_API._format_int32))
-        
-        # Extend Buffer with Data-Length.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(Xcom_API.__data_frame,Xcom_API._format_short_int))
-        
+        # A read-frame only depends on the object and the addresses, so a finished frame is taken from the cache.
+        Key = (object_type, object_id, property_id)
+        try:
+            Buffer = self.__read_frame_cache[Key]
+            self.__read_frame_cache.move_to_end(Key)
+            return Buffer
+        except (KeyError, TypeError):
+            pass
+
+        # Create Buffer with Start-Byte, Frame-Flags, Source-Address, Destination-Address and Data-Length.
+        Buffer = bytearray(Xcom_API.__header_struct.pack(Xcom_API.__start_byte, Xcom_API.__frame_flags, self.__source, self.__dest,
+                                                         Xcom_API.__data_frame))
+
         # Extend Buffer with Header-Checksum.
-        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[1:len(Buffer)]))
-        
-        # Append Buffer with Data-Flags.
-        Buffer.append(Xcom_API.__data_flags)
-        
-        # Append Buffer with Service_ID.
-        Buffer.append(Xcom_API.__service_read)
-        
-        # Extend Buffer with Opject_Type.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(object_type,Xcom_API._format_short_int))
-        
-        # Extend Buffer with Object_ID.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(object_id,Xcom_API._format_int32))
-        
-        # Extend Buffer with Property_ID.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(property_id,Xcom_API._format_short_int))
-        
+        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[1:12]))
+
+        # Extend Buffer with Data-Flags, Service_ID, Opject_Type, Object_ID and Property_ID.
+        Buffer.extend(Xcom_API.__pack_service(Xcom_API.__service_read, object_type, object_id, property_id))
+
         # Extend Buffer with Data-Checksum.
-        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[14:len(Buffer)]))
-        
+        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[14:]))
+
+        # Store the immutable Byte-Frame in the cache. The least recently used frame is removed, if the cache is full.
+        Buffer = bytes(Buffer)
+        if self.__read_frame_cache_size>0:
+            self.__read_frame_cache[Key] = Buffer
+            while len(self.__read_frame_cache)>self.__read_frame_cache_size:
+                self.__read_frame_cache.popitem(last=False)
+
         # Return Byte-Frame.
-        return bytearray(Buffer)
+        return Buffer
         
     #   This method is used to generate a Byte-Frame for a 'write'-instruction. It Returns a List of Bytes.
     
@@ -1237,55 +1152,29 @@ class Xcom_API():
             bytearray(b'\\xAA\\x00\\x01\\x00\\x00\\x00\\x65\\x00\\x00\\x00\\x0E\\x00\\x73\\x79\\x00\\x02\\x02\\x00\\x0A\\x05\\x00\\x00\\x01\\x00\\x00\\x00\\xF0\\x42\\x45\\xDD')
         """
         
-        # Create Buffer
-        Buffer = []
-    
-        # Append Buffer with Start-Byte.
-        Buffer.append(Xcom_API.__start_byte)
-    
-        # Append Buffer with Frame-Flags.
-        Buffer.append(Xcom_API.__frame_flags)
-    
-        # Extend Buffer with Source-Address.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(self.__source,Xcom_API._format_int32))
-    
-        # Extend Buffer with Destination-Address.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(self.__dest,Xcom_API._format_int32))
-    
-        # Extend Buffer with Data-Length.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(Xcom_API.__data_frame + data_format[1],Xcom_API._format_short_int))
-    
+        # Create Buffer with Start-Byte, Frame-Flags, Source-Address, Destination-Address and Data-Length.
+        Buffer = bytearray(Xcom_API.__header_struct.pack(Xcom_API.__start_byte, Xcom_API.__frame_flags, self.__source, self.__dest,
+                                                         Xcom_API.__data_frame + data_format[1]))
+
         # Extend Buffer with Header-Checksum.
-        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[1:len(Buffer)]))
-    
-        # Append Buffer with Data-Flags.
-        Buffer.append(Xcom_API.__data_flags)
-    
-        # Append Buffer with Service_ID.
-        Buffer.append(Xcom_API.__service_write)
-    
-        # Extend Buffer with Opject_Type.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(object_type,Xcom_API._format_short_int))
-    
-        # Extend Buffer with Object_ID.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(object_id,Xcom_API._format_int32))
-    
-        # Extend Buffer with Property_ID.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(property_id,Xcom_API._format_short_int))
-        
+        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[1:12]))
+
+        # Extend Buffer with Data-Flags, Service_ID, Opject_Type, Object_ID and Property_ID.
+        Buffer.extend(Xcom_API.__pack_service(Xcom_API.__service_write, object_type, object_id, property_id))
+
         # Extend Buffer with Property_Data.
-        Buffer.extend(Xcom_API.__value_to_byte_frame(property_data,data_format))
-        
+        Buffer.extend(Xcom_API.__get_format(data_format).encode(property_data))
+
         # Extend Buffer with Data-Checksum.
-        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[14:len(Buffer)]))
-    
+        Buffer.extend(Xcom_API.__calculate_checksum(Buffer[14:]))
+
         # Return Byte-Frame.
-        return bytearray(Buffer)
+        return Buffer
 
     #   This method is used to decode Data from the received Byte-Frame, what you get from the xtender-system.
     #   It returns a List with the result of the returned Data and the Data itself.
 
-    def get_data_from_frame_ext(self, bytearray_of_frame, data_format):
+    def get_data_from_frame_ext(self, bytearray_of_frame, data_format, offset = None):
 
         """
         ### Description:
@@ -1298,6 +1187,9 @@ class Xcom_API():
 
         The **<bytearray_of_frame>** argument is the frame what you get, when you receive data from the serial port.
 
+        If the **<offset>** argument is given, the frame starts at this position of **<bytearray_of_frame>**, which can be a receive-buffer
+        with several frames back to back. Use get_frame_length() to find the start of the next frame.
+
         The **<data_format>** argument is needed to decode the value. For the **<data_format>** argument use one of the following formats:
 
         +-+-+
@@ -1339,31 +1231,23 @@ class Xcom_API():
             [False, 37.203125]
         """
         
-        # Do a Frame-Check. If it fails, it returns a ValueError.
-        if not self.__frame_check_done:
-            if not Xcom_API.__frame_check(self, bytearray_of_frame):
-                raise ValueError('Frame-Check failed!')
-        self.__frame_check_done = False
-        
-        # Check Frame for an Error and return the value.
-        if bytearray_of_frame[14] == 2:
-            # Check if property_data available
-            if len(bytearray_of_frame) == 26:
-                return [False,'value_set']
-            else:
-                return [False, Xcom_API.__byte_frame_to_value(bytearray_of_frame[24:(24+data_format[1])],data_format)]
-        else:
-            return [True, Xcom_API.__byte_frame_to_value(bytearray_of_frame[24:(24+Xcom_API._format_error[1])],Xcom_API._format_error)]
+        # Do a Frame-Check on a memoryview of the buffer. If it fails, it returns a ValueError.
+        View = Xcom_API.__get_view(bytearray_of_frame)
+        Length = Xcom_API.__check_frame_at(self, View, offset)
+        offset = offset or 0
+
+        # Decode the checked frame without a copy.
+        return Xcom_API.__decode_frame(View[offset:offset+Length], data_format)
 
     #   This method is used to generate a Byte-Frame for a 'read'-instruction. It can only be used with a known Object_ID, otherwise it 
-    #   will raise a Value_Error. It Returns a bytearray.
+    #   will raise a Value_Error. It Returns immutable bytes.
     
     def get_read_frame(self, object_id):
 
         """
         ### Description:
         This method is used to generate a Byte-Frame for a 'read'-instruction. It can only be used with a known Object_ID, otherwise it
-        will raise a Value_Error. It Returns a bytearray.
+        will raise a Value_Error. It Returns immutable bytes.
 
         ### Arguments:
         The **<self>** argument is pointing to the object, which calls the method.
@@ -1451,14 +1335,14 @@ class Xcom_API():
         +-+-+
 
         ### Return-Value:
-        This Method return a **bytearray** of the frame.
+        This Method return the frame as **bytes**.
 
         ### Example-Code:
 
         ```>>> Object = Xcom_API()
         >>> Byte_frame = Object.get_read_frame(Xcom_API._info_battery_voltage)
         >>> Byte_frame
-            bytearray(b'\\xAA\\x00\\x01\\x00\\x00\\x00\\x65\\x00\\x00\\x00\\x0A\\x00\\x6F\\x71\\x00\\x01\\x01\\x00\\xB8\\x0B\\x00\\x00\\x01\\x00\\xC5\\x90')
+            b'\\xAA\\x00\\x01\\x00\\x00\\x00\\x65\\x00\\x00\\x00\\x0A\\x00\\x6F\\x71\\x00\\x01\\x01\\x00\\xB8\\x0B\\x00\\x00\\x01\\x00\\xC5\\x90'
         """
         
         try:
@@ -1472,6 +1356,51 @@ class Xcom_API():
             # If the Object_ID is unknown, the method raise a ValueError.
             raise ValueError('Object_ID unknown!')
 
+    #   This method is used to build the read-frames of a list of known Object_IDs in advance, e.g. for a whole poll-list. It returns
+    #   the number of frames in the read-frame-cache.
+
+    def prepare_read_frames(self, object_ids):
+
+        """
+        ### Description:
+        This method is used to build the read-frames of a list of known Object_IDs in advance, e.g. for a whole poll-list. After this
+        a call of get_read_frame() with one of these Object_IDs does no frame construction at all. Unknown Object_IDs raise a Value_Error.
+
+        ### Arguments:
+        The **<self>** argument is pointing to the object, which calls the method.
+
+        The **<object_ids>** argument is an iterable of Object_IDs.
+
+        ### Return-Value:
+        This Method return an **int** with the number of frames in the read-frame-cache.
+
+        ### Example-Code:
+
+        ```>>> Object = Xcom_API()
+        >>> Object.prepare_read_frames([Xcom_API.INFO_BATTERY_VOLTAGE, Xcom_API.INFO_INPUT_VOLTAGE])
+            2
+        """
+
+        for object_id in object_ids:
+            self.get_read_frame(object_id)
+        return len(self.__read_frame_cache)
+
+    #   This method is used to clear the read-frame-cache.
+
+    def clear_read_frame_cache(self):
+
+        """
+        ### Description:
+        This method is used to clear the read-frame-cache.
+
+        ### Example-Code:
+
+        ```>>> Object = Xcom_API()
+        >>> Object.clear_read_frame_cache()
+        """
+
+        self.__read_frame_cache.clear()
+
     #   This method is used to generate a Byte-Frame for a 'write'-instruction. It can only be used with a known Object_ID, otherwise it 
     #   will raise a Value_Error. It Returns a bytearray.
         
@@ -1547,7 +1476,7 @@ class Xcom_API():
     #   This method is used to decode Data from the received Byte-Frame, what you get from the xtender-system. It can only be used with a known Object_ID, 
     #   otherwise it will raise a Value_Error. It returns a List with the result of the returned Data and the Data itself.
 
-    def get_data_from_frame(self, bytearray_of_frame):
+    def get_data_from_frame(self, bytearray_of_frame, offset = None):
 
         """
         ### Description:
@@ -1560,6 +1489,9 @@ class Xcom_API():
 
         The **<bytearray_of_frame>** argument is the frame what you get, when you receive data from the serial port.
 
+        If the **<offset>** argument is given, the frame starts at this position of **<bytearray_of_frame>**, which can be a receive-buffer
+        with several frames back to back. Use get_frame_length() to find the start of the next frame.
+
         ### Return-Value:
         This Method return a **list** with two elements. The First is a **boolean** value, which is **True**, if the xtender-system detects an error and the second 
         element of the **list** then contains the error-id. If no error occures, then the first element is **False** und the second element contains the answer of your request.
@@ -1575,24 +1507,55 @@ class Xcom_API():
             [False, 48.5625]
         """
 
-        try:
-            # Do a Frame-Check. If it fails, it returns a ValueError.
-            if Xcom_API.__frame_check(self, bytearray_of_frame):
-                self.__frame_check_done = True
-            else:
-                raise ValueError('Frame-Check failed!')
+        # Do a Frame-Check on a memoryview of the buffer. If it fails, it returns a ValueError.
+        View = Xcom_API.__get_view(bytearray_of_frame)
+        Length = Xcom_API.__check_frame_at(self, View, offset)
+        offset = offset or 0
+        View = View[offset:offset+Length]
 
+        try:
             # Read Object-ID infomations from Dictionary and store it into a Buffer.
-            Buffer = Xcom_API.__para_info_dict[Xcom_API.__byte_frame_to_value(bytearray_of_frame[18:22],Xcom_API._format_int32)]
-            
-            # Return a Byte-Frame from the Read-Extension method.
-            return self.get_data_from_frame_ext(bytearray_of_frame,Buffer[2])
+            Buffer = Xcom_API.__para_info_dict[Xcom_API._format_int32.decode(View, 18)]
 
         except KeyError:
             # If the Object_ID is unknown, the method raise a ValueError.
-            self.__frame_check_done = False
             raise ValueError('Object_ID unknown!')
 
+        # Decode the checked frame without a copy.
+        return Xcom_API.__decode_frame(View, Buffer[2])
+
+    #   This method is used to check a frame inside a receive-buffer, which can hold several frames back to back. It returns the length
+    #   of the frame.
+
+    def get_frame_length(self, buffer, offset = 0):
+
+        """
+        ### Description:
+        This method is used to check a frame inside a receive-buffer, which can hold several frames back to back. The check is done
+        through a **memoryview**, so the buffer is not copied. It raises a Value_Error, if the frame at **<offset>** is not valid or
+        not complete.
+
+        ### Arguments:
+        The **<self>** argument is pointing to the object, which calls the method.
+
+        The **<buffer>** argument is the receive-buffer (**bytes**, **bytearray** or **memoryview**).
+
+        The **<offset>** argument is the position of the Start-Byte in the **<buffer>**.
+
+        ### Return-Value:
+        This Method return an **int** with the length of the frame. The next frame starts at **<offset>** + length.
+
+        ### Example-Code:
+
+        ```>>> Object = Xcom_API()
+        >>> offset = 0
+        >>> while offset < len(Buffer):
+        ...     Answer = Object.get_data_from_frame(Buffer, offset)
+        ...     offset += Object.get_frame_length(Buffer, offset)
+        """
+
+        return Xcom_API.__check_frame_at(self, buffer, offset)
+
     #   This method is used to return the frame-flags as a binary.
 
     def get_bin_from_frame_flags(self, bytearray_of_frame):
@@ -1736,4 +1699,140 @@ class Xcom_API():
 
         except KeyError:
             # If Error ID is unknown
-            return 'Error-ID is unknown.'
\ No newline at end of file
+            return 'Error-ID is unknown.'
+
+##########################################################################################################################################
+#                                                   Class Definition FrameDecoder                                                        #
+##########################################################################################################################################
+
+#   This class reassembles SCOM-Frames from arbitrary chunks of bytes, e.g. from a non-blocking serial port, a socket or a capture file.
+#   It hunts for the Start-Byte, uses the Data-Length of the header to know how many bytes are missing and checks both checksums. Bytes
+#   in front of a valid frame (noise, broken frames) are dropped, so the decoder resynchronises by itself.
+
+
+class FrameDecoder():
+
+    """
+    This class reassembles SCOM-Frames from arbitrary chunks of bytes, e.g. from a non-blocking serial port, a socket or a capture file.
+    It hunts for the Start-Byte, uses the Data-Length of the header to know how many bytes are missing and checks both checksums. Bytes
+    in front of a valid frame (noise, broken frames) are dropped, so the decoder resynchronises by itself.
+
+    Request- and Response-Frames are both returned, the decoder doesn't check the Response-Flags.
+
+    ### Example-Code:
+
+    ```>>> Decoder = FrameDecoder()
+    >>> for Frame in Decoder.feed(uart.read(uart.in_waiting)):
+    ...     print(Object.get_data_from_frame(Frame))
+    """
+
+    __start_byte                          = 0xAA
+    __header_length                       = 14
+    __length_struct                       = struct.Struct('<H')
+
+    def __init__(self, crc = True, max_data_length = 1024):
+
+        """
+        ### Description:
+        Creates an empty decoder. With **<crc>** = **False** the checksums are not checked. **<max_data_length>** is the biggest
+        Data-Length of the header, which is accepted. A bigger value is treated as a broken header.
+        """
+
+        self.__crc             = crc
+        self.__max_data_length = max_data_length
+        self.__buffer          = bytearray()
+        self.frame_count       = 0
+        self.dropped_bytes     = 0
+        self.checksum_errors   = 0
+
+    def feed(self, data):
+
+        """
+        ### Description:
+        Appends the chunk **<data>** to the internal buffer and returns a **list** with all frames (**bytes**), which are complete now.
+        The remaining bytes of an incomplete frame stay in the buffer until the next call.
+        """
+
+        Buffer = self.__buffer
+        Buffer += data
+        Frames = []
+        Checksum = Xcom_API._Xcom_API__calculate_checksum
+        pos = 0
+
+        while True:
+            # Hunt for the Start-Byte. Everything in front of it is dropped.
+            start = Buffer.find(FrameDecoder.__start_byte, pos)
+            if start<0:
+                self.dropped_bytes += len(Buffer) - pos
+                pos = len(Buffer)
+                break
+            self.dropped_bytes += start - pos
+            pos = start
+
+            # Wait for the complete header.
+            if len(Buffer) - pos < FrameDecoder.__header_length:
+                break
+
+            # Check the Header-Checksum and the Data-Length. On an error the Start-Byte was noise, so hunt for the next one.
+            if self.__crc and not Checksum(Buffer, pos+1, pos+12)==[Buffer[pos+12], Buffer[pos+13]]:
+                self.checksum_errors += 1
+                self.dropped_bytes += 1
+                pos += 1
+                continue
+            Length = FrameDecoder.__length_struct.unpack_from(Buffer, pos+10)[0]
+            if Length>self.__max_data_length:
+                self.dropped_bytes += 1
+                pos += 1
+                continue
+            Length += FrameDecoder.__header_length + 2
+
+            # Wait for the complete frame.
+            if len(Buffer) - pos < Length:
+                break
+
+            # Check the Data-Checksum.
+            if self.__crc and not Checksum(Buffer, pos+14, pos+Length-2)==[Buffer[pos+Length-2], Buffer[pos+Length-1]]:
+                self.checksum_errors += 1
+                self.dropped_bytes += 1
+                pos += 1
+                continue
+
+            Frames.append(bytes(Buffer[pos:pos+Length]))
+            self.frame_count += 1
+            pos += Length
+
+        # Compact the buffer, only the start of an incomplete frame is kept.
+        if pos:
+            del Buffer[:pos]
+        return Frames
+
+    def missing(self):
+
+        """
+        ### Description:
+        Returns the number of bytes, which are at least needed to complete the next frame. Without a complete header this is the
+        rest of the header, otherwise the rest of the frame. A transport can read exactly this number of bytes.
+        """
+
+        if len(self.__buffer)<FrameDecoder.__header_length:
+            return FrameDecoder.__header_length - len(self.__buffer)
+        Length = FrameDecoder.__length_struct.unpack_from(self.__buffer, 10)[0] + FrameDecoder.__header_length + 2
+        return max(Length - len(self.__buffer), 1)
+
+    def pending(self):
+
+        """
+        ### Description:
+        Returns the number of bytes of an incomplete frame in the buffer.
+        """
+
+        return len(self.__buffer)
+
+    def reset(self):
+
+        """
+        ### Description:
+        Clears the buffer, e.g. after a timeout of the transport.
+        """
+
+        self.__buffer.clear()
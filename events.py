@@ -0,0 +1,190 @@
+#Modul events, Aenderungen der gepollten Werte als Server-Sent Events
+#
+#   feed = ChangeFeed()
+#   feed.publish({"id3011": {"value": 230.1, "name": "Netz-Eingangsspannung", "unit": "V"}})
+#   Response(feed.stream(request.headers.get("Last-Event-ID")), mimetype="text/event-stream")
+#
+#jede Aenderung erhoeht die Generation und wird genau einmal serialisiert, alle Abonnenten bekommen dieselben Bytes.
+#Die letzten backlog Events bleiben im Speicher, ein Client mit Last-Event-ID bekommt nur die verpassten Events,
+#liegt seine Generation nicht mehr im Backlog, bekommt er zuerst den kompletten Stand.
+#
+#document() liefert den Stand (oder die Aenderungen seit einer Generation) als JSON und gzip, einmal pro Generation erzeugt.
+#aevents() / astream() sind die Varianten fuer asyncio, ein wartender Abonnent kostet dort nur ein Future statt eines Threads.
+
+import asyncio
+import collections
+import gzip
+import json
+import threading
+
+
+class ChangeFeed(object):
+    def __init__(self, backlog=1024, heartbeat=15.0):
+        self.heartbeat = heartbeat
+        self.generation = 0
+        self.entries = {}           # key -> aktueller Eintrag
+        self.changed = {}           # key -> Generation der letzten Aenderung
+        self.backlog = collections.deque(maxlen=backlog)    # (Generation, SSE Bytes, JSON)
+        self.cond = threading.Condition()
+        self.subscribers = 0
+        self.published = 0
+        self.waiters = set()        # (Loop, Future) der wartenden async Abonnenten
+        self.__documents = {}       # since -> (Generation, JSON, gzip) der aktuellen Generation
+        self.__documents_generation = 0
+
+    # changes: {key: entry}, nur Eintraege, die sich wirklich geaendert haben, erzeugen ein Event
+    def publish(self, changes):
+        with self.cond:
+            changes = {key: entry for key, entry in changes.items() if self.entries.get(key) != entry}
+            if not changes:
+                return self.generation
+            self.generation += 1
+            for key, entry in changes.items():
+                self.entries[key] = entry
+                self.changed[key] = self.generation
+            data = json.dumps({"generation": self.generation, "values": changes}, separators=(',', ':'))
+            self.backlog.append((self.generation, ("id: %d\ndata: %s\n\n" % (self.generation, data)).encode('utf-8'), data))
+            self.published += 1
+            self.cond.notify_all()
+            # publish kann auch aus einem anderen Thread kommen
+            for loop, waiter in self.waiters:
+                loop.call_soon_threadsafe(ChangeFeed.__wake, waiter)
+            self.waiters.clear()
+            return self.generation
+
+    @staticmethod
+    def __wake(waiter):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    # (Generation, JSON Bytes, gzip Bytes) mit allen Eintraegen oder nur denen, die sich nach der Generation since geaendert haben
+    def document(self, since=None):
+        with self.cond:
+            if self.__documents_generation != self.generation:
+                self.__documents = {}
+                self.__documents_generation = self.generation
+            document = self.__documents.get(since)
+            if document is None:
+                if since is None:
+                    values = self.entries
+                else:
+                    values = {key: self.entries[key] for key, generation in self.changed.items() if generation > since}
+                data = json.dumps(values, separators=(',', ':')).encode('utf-8')
+                document = (self.generation, data, gzip.compress(data, 6))
+                # since kommt vom Client, die Anzahl der Varianten pro Generation begrenzen
+                if len(self.__documents) >= 64:
+                    self.__documents.clear()
+                self.__documents[since] = document
+            return document
+
+    def __snapshot(self):
+        data = json.dumps({"generation": self.generation, "values": self.entries, "full": True}, separators=(',', ':'))
+        return self.generation, ("id: %d\ndata: %s\n\n" % (self.generation, data)).encode('utf-8'), data
+
+    # Snapshot fuer einen neuen Abonnenten oder None, wenn die Events nach last noch im Backlog liegen
+    def __first(self, last):
+        oldest = self.backlog[0][0] if self.backlog else self.generation + 1
+        if last is None or last > self.generation or last < oldest - 1:
+            return self.__snapshot()
+        return None
+
+    # Events nach last, mit self.cond und generation > last aufrufen
+    def __pending(self, last):
+        if self.backlog[0][0] > last + 1:
+            # zu langsam gelesen, der Backlog ist weitergelaufen
+            return [self.__snapshot()]
+        return [event for event in self.backlog if event[0] > last]
+
+    # Events nach der Generation last (Tupel wie im Backlog), None alle heartbeat s ohne Aenderung
+    def events(self, last=None):
+        with self.cond:
+            self.subscribers += 1
+        try:
+            with self.cond:
+                snapshot = self.__first(last)
+            if snapshot is not None:
+                last = snapshot[0]
+                yield snapshot
+            while True:
+                with self.cond:
+                    if not self.cond.wait_for(lambda: self.generation > last, self.heartbeat):
+                        pending = None
+                    else:
+                        pending = self.__pending(last)
+                if pending is None:
+                    yield None
+                    continue
+                for event in pending:
+                    yield event
+                last = pending[-1][0]
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+
+    # SSE Stream als Bytes fuer eine Flask Response, last_event_id ist der Header Last-Event-ID (String oder None)
+    def stream(self, last_event_id=None):
+        try:
+            last = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last = None
+        yield b"retry: 3000\n\n"
+        for event in self.events(last):
+            yield event[1] if event is not None else b": ping\n\n"
+
+    # wie events(), als async Generator
+    async def aevents(self, last=None):
+        loop = asyncio.get_running_loop()
+        waiter = None
+        with self.cond:
+            self.subscribers += 1
+            snapshot = self.__first(last)
+        try:
+            if snapshot is not None:
+                last = snapshot[0]
+                yield snapshot
+            while True:
+                with self.cond:
+                    if self.generation > last:
+                        pending = self.__pending(last)
+                    else:
+                        pending = None
+                        waiter = loop.create_future()
+                        self.waiters.add((loop, waiter))
+                if pending is None:
+                    try:
+                        await asyncio.wait_for(waiter, self.heartbeat)
+                    except asyncio.TimeoutError:
+                        with self.cond:
+                            self.waiters.discard((loop, waiter))
+                        yield None
+                    continue
+                for event in pending:
+                    yield event
+                last = pending[-1][0]
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+                # beim Abbruch (Client weg) kann noch ein Future eingetragen sein
+                if waiter is not None:
+                    self.waiters.discard((loop, waiter))
+
+    # wie stream(), als async Generator
+    async def astream(self, last_event_id=None):
+        try:
+            last = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last = None
+        yield b"retry: 3000\n\n"
+        async for event in self.aevents(last):
+            yield event[1] if event is not None else b": ping\n\n"
+
+    # nur die JSON Nachrichten, z.B. fuer einen WebSocket
+    def messages(self, last=None):
+        for event in self.events(last):
+            if event is not None:
+                yield event[2]
+
+    def stats(self):
+        with self.cond:
+            return {"generation": self.generation, "subscribers": self.subscribers, "published": self.published,
+                    "backlog": len(self.backlog)}
@@ -0,0 +1,116 @@
+#Modul history, Zeitreihen der gepollten Werte im Speicher
+#
+#   h = History(span=86400)                             -> 24 h pro ID
+#   h.append(3011, time.time(), 230.1, interval=5.0)    -> Ringpuffer fuer 24 h bei 5 s
+#   h.query(3011, t_from, t_to, points=500)             -> {"resolution": 0, "t": [...], "min": [...], "max": [...], "mean": [...]}
+#
+#pro ID ein Ringpuffer fester Groesse (numpy float32 Werte, int64 Zeitstempel in ms), Speicher pro ID = capacity * 12 Bytes.
+#Die Werte kommen als SCOM float32, float32 verliert also nichts. Die Groesse ergibt sich aus span und dem Poll-Intervall
+#der ID, ein Kanal mit 60 s braucht so nur 1/12 eines Kanals mit 5 s. Wird schneller gepollt, deckt der Puffer weniger
+#als span ab, der Rest kommt aus dem SampleStore.
+
+import math
+import numpy as np
+import threading
+
+
+class RingBuffer(object):
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.t = np.zeros(capacity, dtype=np.int64)
+        self.v = np.zeros(capacity, dtype=np.float32)
+        self.head = 0           # naechste Schreibposition
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, t, v):
+        with self.lock:
+            self.t[self.head] = t
+            self.v[self.head] = v
+            self.head = (self.head + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+
+    # Kopie aller Werte mit t_from <= t <= t_to, zeitlich sortiert. Die beiden Teile des Rings sind jeweils sortiert
+    # und werden einzeln per Binaersuche begrenzt, kopiert wird nur der angefragte Bereich.
+    def range(self, t_from=None, t_to=None):
+        with self.lock:
+            if self.count < self.capacity:
+                parts = [(0, self.count)]
+            else:
+                parts = [(self.head, self.capacity), (0, self.head)]
+            ts, vs = [], []
+            for start, end in parts:
+                t = self.t[start:end]
+                lo = 0 if t_from is None else np.searchsorted(t, t_from, 'left')
+                hi = len(t) if t_to is None else np.searchsorted(t, t_to, 'right')
+                ts.append(t[lo:hi])
+                vs.append(self.v[start:end][lo:hi])
+            return np.concatenate(ts), np.concatenate(vs)
+
+    # Reduktion auf hoechstens points Zeitintervalle gleicher Breite mit min / max / mean, leere Intervalle entfallen,
+    # dazu die Breite der Intervalle in s (0 = Rohwerte)
+    def downsample(self, t_from=None, t_to=None, points=500):
+        t, v = self.range(t_from, t_to)
+        if len(t) <= points:
+            return t, v, v, v, 0
+        edges = np.linspace(t[0], t[-1] + 1, points + 1)
+        starts = np.unique(np.searchsorted(t, edges[:-1], 'left'))
+        starts = starts[starts < len(t)]
+        counts = np.diff(np.append(starts, len(t)))
+        return (t[starts], np.minimum.reduceat(v, starts), np.maximum.reduceat(v, starts),
+                np.add.reduceat(v, starts, dtype=np.float64) / counts, (edges[1] - edges[0]) / 1000.0)
+
+    # aeltester gespeicherter Zeitstempel in ms, None wenn leer
+    def oldest(self):
+        with self.lock:
+            if not self.count:
+                return None
+            return int(self.t[self.head if self.count == self.capacity else 0])
+
+    @property
+    def nbytes(self):
+        return self.t.nbytes + self.v.nbytes
+
+
+class History(object):
+    # span: Zeitraum pro ID in s, interval: Poll-Intervall fuer IDs ohne eigenes, min_capacity fuer einmal gelesene Werte
+    def __init__(self, span=86400.0, interval=5.0, min_capacity=16):
+        self.span = span
+        self.interval = interval
+        self.min_capacity = min_capacity
+        self.buffers = {}
+        self.lock = threading.Lock()
+
+    def capacity(self, interval=None):
+        return max(int(math.ceil(self.span / (interval or self.interval))), self.min_capacity)
+
+    # interval zaehlt nur beim Anlegen des Ringpuffers
+    def buffer(self, id, interval=None):
+        with self.lock:
+            buffer = self.buffers.get(id)
+            if buffer is None:
+                buffer = self.buffers[id] = RingBuffer(self.capacity(interval))
+            return buffer
+
+    # timestamp in s wie time.time(), nur Zahlen werden gespeichert (keine Fehlertexte)
+    def append(self, id, timestamp, value, interval=None):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.buffer(id, interval).append(int(timestamp * 1000), value)
+
+    def oldest(self, id):
+        buffer = self.buffers.get(id)
+        return buffer.oldest() if buffer is not None else None
+
+    # t_from / t_to in ms, Ergebnis mit denselben Schluesseln wie store.SampleStore.query (resolution in s, 0 = Rohwerte)
+    def query(self, id, t_from=None, t_to=None, points=500):
+        buffer = self.buffers.get(id)
+        if buffer is None:
+            return {"id": id, "resolution": 0, "t": [], "min": [], "max": [], "mean": []}
+        t, vmin, vmax, vmean, resolution = buffer.downsample(t_from, t_to, max(points, 1))
+        return {"id": id, "resolution": resolution, "t": t.tolist(), "min": vmin.tolist(), "max": vmax.tolist(),
+                "mean": vmean.tolist()}
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for b in list(self.buffers.values()))
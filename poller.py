@@ -0,0 +1,263 @@
+#Modul poller, Deadline Scheduler fuer das Polling vieler IDs
+#
+#   p = PollScheduler(conn.read_id, conn.read_ids)
+#   p.add(api.INFO_INPUT_VOLTAGE, 5.0, lambda item: print(item.value))
+#   p.start()
+#
+#die naechsten Faelligkeiten liegen in einem Min-Heap, der Thread schlaeft genau bis zur naechsten,
+#alles was innerhalb von group_window faellig wird, wird in einem Sweep gelesen.
+#Fixed-Rate: die naechste Faelligkeit ist due + interval, nicht Ende des Reads + interval, so laufen die Zeiten nicht weg.
+#
+#adaptive Items (min_interval / max_interval / deadband): aendert sich der Wert um mehr als deadband, wird das Intervall
+#halbiert, sonst um backoff verlaengert. Das Budget (Reads pro s) begrenzt die Summe aller adaptiven Items, dann werden
+#deren Intervalle gemeinsam gestreckt, flache Kanaele liegen dabei schon an ihrem max_interval und kosten kaum Busszeit.
+#
+#run_async() ist dieselbe Schleife als Coroutine fuer einen Event-Loop (read / read_many sind dann Coroutinen, z.B.
+#AsyncXcom232.read_id), ohne eigenen Thread.
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+
+
+class PollItem(object):
+    __slots__ = ('id', 'interval', 'min_interval', 'max_interval', 'deadband', 'callback', 'due', 'value', 'ok', 'timestamp',
+                 'reads', 'skipped', 'late_last', 'late_max', 'late_sum', 'removed')
+
+    # interval None = nur einmal lesen (z.B. Parameter)
+    def __init__(self, id, interval, callback, due, min_interval=None, max_interval=None, deadband=None):
+        self.id = id
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.deadband = deadband
+        self.callback = callback
+        self.due = due
+        self.value = None
+        self.ok = False
+        self.timestamp = 0.0        # time.time() des letzten Reads
+        self.reads = 0
+        self.skipped = 0            # ausgelassene Faelligkeiten, wenn der Bus nicht hinterher kommt
+        self.late_last = 0.0
+        self.late_max = 0.0
+        self.late_sum = 0.0
+        self.removed = False
+
+    @property
+    def adaptive(self):
+        return self.deadband is not None and self.interval is not None
+
+    def stats(self):
+        return {"id": self.id, "interval": self.interval, "reads": self.reads, "skipped": self.skipped,
+                "late_last": self.late_last, "late_max": self.late_max,
+                "late_mean": self.late_sum / self.reads if self.reads else 0.0}
+
+
+class PollScheduler(object):
+    # read(id) liest eine ID, read_many(ids) optional einen ganzen Sweep und liefert [(ok, Wert), ...] (wie xcom232.read_ids)
+    # max_sweep begrenzt die Groesse eines Sweeps, damit z.B. Schreibzugriffe im PriorityScheduler nicht zu lange warten
+    # einmalige Items, deren Read scheitert, werden nach retry_interval erneut versucht
+    # spread: Versatz der Startzeiten neuer Items, sonst werden alle Items mit gleichem Intervall immer gemeinsam faellig
+    # budget: maximale Reads pro s aller adaptiven Items (None = unbegrenzt), backoff: Faktor fuer flache Werte
+    def __init__(self, read, read_many=None, group_window=0.05, max_sweep=8, retry_interval=5.0, spread=0.005, budget=None,
+                 backoff=1.5):
+        self.read = read
+        self.budget = budget
+        self.backoff = backoff
+        self.retry_interval = retry_interval
+        self.spread = spread
+        self.read_many = read_many
+        self.group_window = group_window
+        self.max_sweep = max_sweep
+        self.heap = []
+        self.items = []
+        self.counter = itertools.count()
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.sweeps = 0
+
+    # mit deadband ist das Item adaptiv, interval ist dann der Startwert zwischen min_interval und max_interval
+    def add(self, id, interval, callback=None, delay=None, min_interval=None, max_interval=None, deadband=None):
+        with self.cond:
+            if delay is None:
+                delay = (len(self.items) * self.spread) % interval if interval else 0.0
+            item = PollItem(id, interval, callback, time.monotonic() + delay, min_interval or interval, max_interval or interval,
+                            deadband)
+            self.items.append(item)
+            heapq.heappush(self.heap, (item.due, next(self.counter), item))
+            self.cond.notify()
+        return item
+
+    def remove(self, item):
+        # der Eintrag im Heap wird beim naechsten Erreichen verworfen
+        with self.cond:
+            item.removed = True
+            self.items.remove(item)
+
+    # Faelligkeit neu setzen, z.B. wenn sich das Intervall geaendert hat
+    def reschedule(self, item, due):
+        with self.cond:
+            item.due = due
+            heapq.heappush(self.heap, (due, next(self.counter), item))
+            self.cond.notify()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join()
+
+    # (Sweep, None) wenn etwas faellig ist, sonst (None, Wartezeit bis zur naechsten Faelligkeit), Wartezeit None = Heap leer
+    def __take_sweep(self):
+        # verworfene oder neu eingeplante Eintraege oben vom Heap entfernen
+        while self.heap and (self.heap[0][2].removed or self.heap[0][0] != self.heap[0][2].due):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None, None
+        wait = self.heap[0][0] - time.monotonic()
+        if wait > 0:
+            return None, wait
+        limit = time.monotonic() + self.group_window
+        sweep = []
+        while self.heap and self.heap[0][0] <= limit and len(sweep) < self.max_sweep:
+            due, _, item = heapq.heappop(self.heap)
+            if not item.removed and due == item.due:
+                sweep.append(item)
+        return sweep or None, 0.0
+
+    def __next_sweep(self):
+        with self.cond:
+            while self.running:
+                sweep, wait = self.__take_sweep()
+                if sweep:
+                    return sweep
+                if wait is None:
+                    self.cond.wait()
+                elif wait > 0:
+                    self.cond.wait(wait)
+            return None
+
+    def __adapt(self, item, value):
+        if not isinstance(value, (int, float)) or not isinstance(item.value, (int, float)) or not item.reads:
+            return
+        if abs(value - item.value) > item.deadband:
+            item.interval = max(item.interval / 2, item.min_interval)
+        else:
+            item.interval = min(item.interval * self.backoff, item.max_interval)
+
+    # Streckfaktor, damit die adaptiven Items zusammen im Budget bleiben
+    def __stretch(self):
+        if self.budget is None:
+            return 1.0
+        load = sum(1.0 / i.interval for i in self.items if i.adaptive)
+        return max(load / self.budget, 1.0)
+
+    def __finish(self, item, ok, value, start, timestamp):
+        # read_id liefert bei einer SCOM Fehlerantwort den Fehlertext statt zu scheitern, wie im read_many Pfad ein Fehler
+        if ok and isinstance(value, str):
+            ok = False
+        if ok and item.adaptive:
+            self.__adapt(item, value)
+        late = max(start - item.due, 0.0)
+        item.reads += 1
+        item.late_last = late
+        item.late_max = max(item.late_max, late)
+        item.late_sum += late
+        item.ok = ok
+        if ok:
+            item.value = value
+            item.timestamp = timestamp
+        if item.callback is not None:
+            try:
+                item.callback(item)
+            except Exception as e:
+                print("Error poll callback", item.id, repr(e))
+        now = time.monotonic()
+        if item.interval is None:
+            if ok:
+                return
+            due = now + self.retry_interval
+        else:
+            # Fixed-Rate, verpasste Faelligkeiten werden uebersprungen statt nachgeholt
+            interval = item.interval
+            if item.adaptive:
+                interval = min(interval * self.__stretch(), item.max_interval)
+            due = item.due + interval
+            if due <= now:
+                missed = math.ceil((now - due) / interval)
+                item.skipped += missed
+                due += missed * interval
+        with self.cond:
+            if not item.removed:
+                item.due = due
+                heapq.heappush(self.heap, (due, next(self.counter), item))
+
+    def run(self):
+        self.running = True
+        while True:
+            sweep = self.__next_sweep()
+            if sweep is None:
+                return
+            self.sweeps += 1
+            start = time.monotonic()
+            timestamp = time.time()
+            if self.read_many is not None and len(sweep) > 1:
+                try:
+                    results = self.read_many([item.id for item in sweep])
+                except Exception as e:
+                    print("Error poll sweep", repr(e))
+                    results = [(False, e)] * len(sweep)
+            else:
+                results = []
+                for item in sweep:
+                    try:
+                        results.append((True, self.read(item.id)))
+                    except Exception as e:
+                        print("Error poll", item.id, repr(e))
+                        results.append((False, e))
+            for item, (ok, value) in zip(sweep, results):
+                self.__finish(item, ok, value, start, timestamp)
+
+    # wie run(), aber als Task im Event-Loop, z.B. asyncio.ensure_future(p.run_async()), beenden mit cancel()
+    async def run_async(self):
+        self.running = True
+        while self.running:
+            with self.cond:
+                sweep, wait = self.__take_sweep()
+            if not sweep:
+                # add() aus dem Loop weckt die Coroutine nicht, deshalb hoechstens 1 s am Stueck schlafen
+                await asyncio.sleep(min(wait if wait is not None else 1.0, 1.0))
+                continue
+            self.sweeps += 1
+            start = time.monotonic()
+            timestamp = time.time()
+            if self.read_many is not None and len(sweep) > 1:
+                try:
+                    results = await self.read_many([item.id for item in sweep])
+                except Exception as e:
+                    print("Error poll sweep", repr(e))
+                    results = [(False, e)] * len(sweep)
+            else:
+                results = []
+                for item in sweep:
+                    try:
+                        results.append((True, await self.read(item.id)))
+                    except Exception as e:
+                        print("Error poll", item.id, repr(e))
+                        results.append((False, e))
+            for item, (ok, value) in zip(sweep, results):
+                self.__finish(item, ok, value, start, timestamp)
+
+    def stats(self):
+        with self.cond:
+            return {"sweeps": self.sweeps, "items": [item.stats() for item in self.items]}
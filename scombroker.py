@@ -0,0 +1,257 @@
+#Modul scombroker, ein Prozess besitzt den seriellen Port exklusiv und bedient lokale Clients ueber einen Unix Domain Socket
+#
+#   python3 scombroker.py [/dev/ttyUSB0] [/tmp/xcom232.sock]
+#
+#ScomClient ist ein Ersatz fuer xcom232 (read_id / write_id / api), z.B. xtender.Xtender(conn=ScomClient())
+#xtenderweb und scomflask nehmen ihn mit XCOM_BROKER=/tmp/xcom232.sock (xtender.Xtender ohne conn), statt den Port selbst zu oeffnen
+#
+#Protokoll (little endian):
+#   Request  : seq u32, op u8 (1=read, 2=write), id u32, kind u8, value f64             = 18 Bytes
+#   Response : seq u32, status u8, kind u8, length u16, payload (length Bytes)
+#   kind     : 0=none, 1=int, 2=float, 3=text (utf-8)
+#   status   : 0=ok, 1=Fehler (payload ist die Fehlermeldung)
+
+from api import Xcom_API
+import asyncio
+import socket
+import struct
+import sys
+import threading
+
+SOCKET_PATH = '/tmp/xcom232.sock'
+
+OP_READ = 1
+OP_WRITE = 2
+
+KIND_NONE = 0
+KIND_INT = 1
+KIND_FLOAT = 2
+KIND_TEXT = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+REQUEST = struct.Struct('<IBIBd')
+RESPONSE = struct.Struct('<IBBH')
+INT_VALUE = struct.Struct('<q')
+FLOAT_VALUE = struct.Struct('<d')
+
+
+def encode_value(value):
+    if value is None:
+        return KIND_NONE, b''
+    if isinstance(value, float):
+        return KIND_FLOAT, FLOAT_VALUE.pack(value)
+    if isinstance(value, int):
+        return KIND_INT, INT_VALUE.pack(value)
+    return KIND_TEXT, str(value).encode('utf-8')
+
+
+def decode_value(kind, payload):
+    if kind == KIND_FLOAT:
+        return FLOAT_VALUE.unpack(payload)[0]
+    if kind == KIND_INT:
+        return INT_VALUE.unpack(payload)[0]
+    if kind == KIND_TEXT:
+        return payload.decode('utf-8')
+    return None
+
+
+class _BrokerClient(object):
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.closed = False
+
+
+class ScomBroker(object):
+    # conn ist ein Transport mit async read_id / write_id, z.B. AsyncXcom232
+    def __init__(self, conn, path=SOCKET_PATH, queue_size=64):
+        self.conn = conn
+        self.path = path
+        self.queue_size = queue_size
+        self.clients = []
+        self.inflight = {}      # id -> Future, gleiche Reads werden zusammengefasst
+        self.requests = 0
+        self.coalesced = 0
+        self.transactions = 0
+        self.__work = asyncio.Event()
+
+    async def serve_forever(self):
+        server = await asyncio.start_unix_server(self.__handle_client, path=self.path)
+        worker = asyncio.ensure_future(self.__supervise())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+
+    async def __handle_client(self, reader, writer):
+        client = _BrokerClient(writer, self.queue_size)
+        self.clients.append(client)
+        pending = set()
+        try:
+            while True:
+                seq, op, id, kind, value = REQUEST.unpack(await reader.readexactly(REQUEST.size))
+                self.requests += 1
+                if kind == KIND_INT:
+                    value = int(value)
+                elif kind == KIND_NONE:
+                    value = None
+                if op == OP_READ and id in self.inflight:
+                    self.coalesced += 1
+                    answer = self.inflight[id]
+                else:
+                    answer = asyncio.get_running_loop().create_future()
+                    if op == OP_READ:
+                        self.inflight[id] = answer
+                    # volle Queue bremst nur diesen Client
+                    await client.queue.put((op, id, value, answer))
+                    self.__work.set()
+                task = asyncio.ensure_future(self.__respond(client, seq, answer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # schon eingereihte Requests laufen weiter, andere Clients koennen auf dieselben Reads warten,
+            # aus self.clients entfernt nur der Worker (er iteriert ueber eine Kopie der Liste)
+            client.closed = True
+            self.__work.set()
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def __respond(self, client, seq, answer):
+        try:
+            status, (kind, payload) = STATUS_OK, encode_value(await asyncio.shield(answer))
+        except Exception as e:
+            status, (kind, payload) = STATUS_ERROR, encode_value(repr(e))
+        if not client.writer.is_closing():
+            client.writer.write(RESPONSE.pack(seq, status, kind, len(payload)) + payload)
+
+    # ein Fehler im Worker darf den Broker nicht stillegen, sonst haengen alle Clients
+    async def __supervise(self):
+        while True:
+            try:
+                await self.__bus_worker()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("Error broker worker, restart", repr(e))
+                self.__work.set()
+                await asyncio.sleep(0.1)
+
+    # der einzige Zugriff auf den Bus, die Client Queues werden reihum abgearbeitet
+    async def __bus_worker(self):
+        while True:
+            await self.__work.wait()
+            self.__work.clear()
+            busy = True
+            while busy:
+                busy = False
+                for client in list(self.clients):
+                    if client.queue.empty():
+                        if client.closed:
+                            self.clients.remove(client)
+                        continue
+                    busy = True
+                    op, id, value, answer = client.queue.get_nowait()
+                    self.transactions += 1
+                    try:
+                        if op == OP_READ:
+                            result = await self.conn.read_id(id)
+                        else:
+                            result = await self.conn.write_id(id, value)
+                        answer.set_result(result)
+                    except Exception as e:
+                        answer.set_exception(e)
+                    finally:
+                        if op == OP_READ and self.inflight.get(id) is answer:
+                            del self.inflight[id]
+
+    def stats(self):
+        return {"requests": self.requests, "coalesced": self.coalesced, "transactions": self.transactions,
+                "clients": len(self.clients)}
+
+
+class ScomClient(object):
+    # Ersatz fuer xcom232, spricht mit dem Broker statt mit dem Port
+    def __init__(self, path=SOCKET_PATH, timeout=5):
+        self.port = path
+        self.timeout = timeout
+        self.api = Xcom_API(crc=True, source=1, destination=101)
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.sock = None
+
+    def __connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.port)
+
+    def __recv_exact(self, n):
+        data = bytearray()
+        while len(data) < n:
+            chunk = self.sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("broker closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def __request(self, op, id, value=None):
+        with self.lock:
+            try:
+                if self.sock is None:
+                    self.__connect()
+                self.seq = (self.seq + 1) & 0xFFFFFFFF
+                kind = KIND_NONE
+                if isinstance(value, float):
+                    kind = KIND_FLOAT
+                elif isinstance(value, int):
+                    kind = KIND_INT
+                self.sock.sendall(REQUEST.pack(self.seq, op, id, kind, float(value or 0)))
+                seq, status, kind, length = RESPONSE.unpack(self.__recv_exact(RESPONSE.size))
+                result = decode_value(kind, self.__recv_exact(length))
+                if seq != self.seq:
+                    raise ConnectionError("broker answered out of sequence")
+            except Exception:
+                # Verbindung verwerfen, beim naechsten Aufruf wird neu verbunden
+                if self.sock is not None:
+                    self.sock.close()
+                    self.sock = None
+                raise
+        if status != STATUS_OK:
+            raise Exception(result)
+        return result
+
+    def read_id(self, id:int):
+        try:
+            return self.__request(OP_READ, id)
+        except:
+            print("Error broker read_id : " + str(id))
+            raise
+
+    def write_id(self, id:int, data):
+        try:
+            return self.__request(OP_WRITE, id, data)
+        except:
+            print("Error broker write_id")
+            raise
+
+    def __del__(self):
+        if self.sock is not None:
+            self.sock.close()
+
+
+if __name__ == '__main__':
+    from xcom232async import AsyncXcom232
+    import os
+    port = sys.argv[1] if len(sys.argv) > 1 else '/dev/ttyUSB0'
+    path = sys.argv[2] if len(sys.argv) > 2 else SOCKET_PATH
+    if os.path.exists(path):
+        os.unlink(path)
+
+    async def main():
+        await ScomBroker(AsyncXcom232(port=port), path).serve_forever()
+    asyncio.run(main())
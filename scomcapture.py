@@ -0,0 +1,132 @@
+#Modul scomcapture, Mitschnitt aller TX/RX Frames in eine kompakte Binaerdatei und deterministische Wiedergabe
+#
+#   cap = CaptureWriter('/tmp/scom.cap')
+#   c = xcom232(port='/dev/ttyUSB0', capture=cap)
+#
+#   for timestamp, gateway, answer in CaptureReplay('/tmp/scom.cap').replay():
+#       print(timestamp, gateway, answer)
+#
+#Dateiformat (little endian):
+#   Header : b'SCOMCAP1'
+#   Record : timestamp_ns i64 (time.monotonic_ns), direction u8 (0=TX, 1=RX), gateway u16, length u16, frame (length Bytes)
+
+from api import Xcom_API
+import mmap
+import struct
+import time
+
+MAGIC = b'SCOMCAP1'
+RECORD = struct.Struct('<qBHH')
+
+TX = 0
+RX = 1
+
+
+class CaptureWriter(object):
+    # schreibt gepuffert, ein Record kostet ein pack und ein write in den Puffer (unter 1 us)
+    # Header und Frame gehen in einem write, so koennen sich Records mehrerer Threads nicht vermischen
+    def __init__(self, path, buffer_size=65536):
+        self.path = path
+        self.file = open(path, 'ab', buffering=buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.__write = self.file.write
+        self.__pack = RECORD.pack
+        self.__clock = time.monotonic_ns
+
+    def record(self, direction, gateway, frame):
+        self.__write(self.__pack(self.__clock(), direction, gateway, len(frame)) + frame)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CaptureReader(object):
+    # liest die Datei ueber mmap, die Frames werden als bytes geliefert (kurze Kopie pro Frame). Eine memoryview auf die mmap
+    # wuerde close() mit BufferError scheitern lassen, solange ein Aufrufer noch einen Frame haelt.
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(path + " is not a SCOM capture file")
+
+    def __iter__(self):
+        data = self.map
+        offset = len(MAGIC)
+        end = len(data)
+        while offset + RECORD.size <= end:
+            timestamp, direction, gateway, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if offset + length > end:
+                # letzter Record unvollstaendig (Aufzeichnung lief noch)
+                break
+            yield timestamp, direction, gateway, data[offset:offset + length]
+            offset += length
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class CaptureReplay(object):
+    # spielt einen Mitschnitt durch Xcom_API.get_data_from_frame, mit realtime=True im Originaltakt
+    # als Transport liefert read_id / write_id die aufgezeichneten Antworten in der aufgezeichneten Reihenfolge
+    def __init__(self, path, realtime=False, destination=101):
+        self.reader = CaptureReader(path)
+        self.realtime = realtime
+        self.api = Xcom_API(crc=True, source=1, destination=destination)
+        self.__transactions = None
+
+    def __paced(self):
+        start_capture = None
+        start = time.monotonic_ns()
+        for timestamp, direction, gateway, frame in self.reader:
+            if self.realtime:
+                if start_capture is None:
+                    start_capture = timestamp
+                delay = (timestamp - start_capture) - (time.monotonic_ns() - start)
+                if delay > 0:
+                    time.sleep(delay / 1e9)
+            yield timestamp, direction, gateway, frame
+
+    def replay(self):
+        for timestamp, direction, gateway, frame in self.__paced():
+            if direction != RX:
+                continue
+            try:
+                yield timestamp, gateway, self.api.get_data_from_frame(frame)
+            except ValueError as e:
+                yield timestamp, gateway, e
+
+    # TX Frame und die folgende Antwort bilden eine Transaktion
+    def __next_transaction(self, request):
+        if self.__transactions is None:
+            self.__transactions = self.__paced()
+        pending = None
+        for timestamp, direction, gateway, frame in self.__transactions:
+            if direction == TX:
+                pending = bytes(frame) == request
+            elif pending:
+                return bytes(frame)
+        raise EOFError("no more transactions in " + self.reader.path)
+
+    def read_id(self, id:int):
+        result = self.api.get_data_from_frame(self.__next_transaction(self.api.get_read_frame(id)))
+        if result[0] == True:
+            return self.api.get_text_from_error_id(result[1])
+        else:
+            return result[1]
+
+    def write_id(self, id:int, data):
+        return self.api.get_data_from_frame(self.__next_transaction(bytes(self.api.get_write_frame(id, data))))[1]
+
+    def close(self):
+        if self.__transactions is not None:
+            self.__transactions.close()
+            self.__transactions = None
+        self.reader.close()
@@ -1,7 +1,13 @@
 from flask import Flask, render_template, jsonify, request
+from transport import PriorityScheduler, ReadThrough, RateLimitError
 import xtender
+import time
 
 app = Flask(__name__)
+x = xtender.Xtender()
+# alle Reads der Requests laufen ueber einen Worker, gleiche IDs werden zusammengefasst, hoechstens 2 Reads pro s
+bus = PriorityScheduler(x.conn)
+cache = ReadThrough(bus.read_id, rate=2.0, burst=5)
 
 @app.route('/')
 def hello():
@@ -14,15 +20,42 @@ def status():
 
 @app.route( "/u_eingang" )
 def f_u_eingang():
-    return jsonify( {"u_eingang": xtender.input.voltage.value} )
+    return jsonify( {"u_eingang": x.input.voltage.value} )
 
 
 @app.route( "/value_by_id" )
 def f_value_by_id():
     id =  request.args.get("id", default = 3000, type = int)
+    max_age = request.args.get("max_age", default = 5.0, type = float)
     j = "id_" + str(id)
-    print(id)
-    return jsonify( {j: xtender.read_id(id)} )
+    try:
+        value, timestamp = cache.get(id, max_age)
+    except RateLimitError as e:
+        return jsonify( {j: None, "error": str(e)} ), 429, {"Retry-After": "1"}
+    except Exception as e:
+        return jsonify( {j: None, "error": repr(e)} ), 503
+    return jsonify( {j: value, "age": round(time.time() - timestamp, 3)} )
+
+
+@app.route( "/values" )
+def f_values():
+    try:
+        ids = [int(i) for i in request.args.get("ids", default = "").split(",") if i.strip()]
+    except ValueError:
+        return jsonify( {"error": "ids must be numbers"} ), 400
+    if len(ids) > 32:
+        return jsonify( {"error": "at most 32 ids"} ), 400
+    max_age = request.args.get("max_age", default = 5.0, type = float)
+    values = {}
+    errors = {}
+    for id in dict.fromkeys(ids):
+        try:
+            values["id_" + str(id)] = cache.get(id, max_age)[0]
+        except Exception as e:
+            errors["id_" + str(id)] = str(e) if isinstance(e, RateLimitError) else repr(e)
+    if errors:
+        values["errors"] = errors
+    return jsonify(values)
 
 
 if __name__ == '__main__':
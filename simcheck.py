@@ -0,0 +1,132 @@
+#Modul simcheck, prueft xcom232, PriorityScheduler und PollScheduler gegen xtendersim, ohne Hardware
+#
+#   python3 simcheck.py
+#
+#jeder Check startet einen eigenen Simulator (eigenes pty), bricht mit AssertionError ab und gibt sonst "ok" und die Zeit aus.
+#Fehler werden ueber den Simulator eingespeist: errors={Fehlercode: Wahrscheinlichkeit}, drop_rate fuer fehlende Antworten.
+
+from api import Xcom_API
+from xcom232 import xcom232
+from xtendersim import XtenderSimulator, ERROR_GATEWAY_BUSY, ERROR_RESPONSE_TIMEOUT
+from transport import PriorityScheduler, CircuitOpenError, PRIORITY_POLL
+from poller import PollScheduler
+import time
+
+INFO_IDS = [Xcom_API.INFO_INPUT_VOLTAGE, Xcom_API.INFO_INPUT_CURRENT, Xcom_API.INFO_BATTERY_VOLTAGE,
+            Xcom_API.INFO_OUTPUT_POWER, Xcom_API.INFO_OUTPUT_CURRENT]
+
+
+def simulator(**kwargs):
+    sim = XtenderSimulator(**kwargs)
+    sim.start()
+    return sim
+
+
+def check_read():
+    sim = simulator()
+    c = xcom232(port=sim.port, timeout=0.5)
+    assert 220.0 < c.read_id(Xcom_API.INFO_INPUT_VOLTAGE) < 240.0
+    assert 45.0 < c.read_id(Xcom_API.INFO_BATTERY_VOLTAGE) < 58.0
+    results = c.read_ids(INFO_IDS)
+    assert len(results) == len(INFO_IDS) and all(ok for ok, _ in results), results
+    assert c.metrics.snapshot()["transactions"] == 2 + len(INFO_IDS)
+    sim.stop()
+
+
+def check_write():
+    sim = simulator()
+    c = xcom232(port=sim.port, timeout=0.5)
+    assert c.write_id(Xcom_API.PARA_BATTERY_CHARGE_CURRENT, 42.0) == 'value_set'
+    assert c.read_id(Xcom_API.PARA_BATTERY_CHARGE_CURRENT) == 42.0
+    # INFO Objekte sind nur lesbar, das lehnt schon die API ab
+    try:
+        c.write_id(Xcom_API.INFO_INPUT_VOLTAGE, 1.0)
+        assert False, "write to INFO object"
+    except ValueError:
+        pass
+    sim.stop()
+
+
+def check_scom_error():
+    # SCOM Fehlerantwort: read_id liefert den Fehlertext, write_id den Fehlercode, read_ids (False, Fehlertext)
+    sim = simulator(errors={ERROR_RESPONSE_TIMEOUT: 1.0})
+    c = xcom232(port=sim.port, timeout=0.5)
+    assert isinstance(c.read_id(Xcom_API.INFO_INPUT_VOLTAGE), str)
+    assert c.write_id(Xcom_API.PARA_BATTERY_CHARGE_CURRENT, 42.0) == ERROR_RESPONSE_TIMEOUT
+    assert all(not ok and isinstance(value, str) for ok, value in c.read_ids(INFO_IDS))
+    # eine Fehlerantwort ist eine Antwort, der Link bleibt geschlossen
+    assert c.breaker.stats()["state"] == "closed"
+    sim.stop()
+
+
+def check_gateway_busy():
+    # GATEWAY_BUSY wird innerhalb der deadline wiederholt, die Aufrufe gelingen trotzdem
+    sim = simulator(errors={ERROR_GATEWAY_BUSY: 0.3}, seed=1)
+    c = xcom232(port=sim.port, timeout=0.5, deadline=3.0, backoff=0.01)
+    for i in range(20):
+        assert c.write_id(Xcom_API.PARA_BATTERY_CHARGE_CURRENT, float(i)) == 'value_set'
+    assert c.read_id(Xcom_API.PARA_BATTERY_CHARGE_CURRENT) == 19.0
+    assert sim.injected > 0 and c.metrics.snapshot()["retries"] >= sim.injected - 1
+    sim.stop()
+
+
+def check_drop():
+    # ohne Antworten: ein Read scheitert nach read_deadline, ein Sweep nach 2 Timeouts, danach oeffnet der CircuitBreaker
+    sim = simulator(drop_rate=1.0)
+    c = xcom232(port=sim.port, timeout=0.1, failure_threshold=4, reset_timeout=60.0)
+    start = time.monotonic()
+    try:
+        c.read_id(Xcom_API.INFO_INPUT_VOLTAGE)
+        assert False, "read without answer"
+    except TimeoutError:
+        pass
+    assert time.monotonic() - start < 0.5
+    start = time.monotonic()
+    results = c.read_ids(INFO_IDS)
+    assert not any(ok for ok, _ in results) and time.monotonic() - start < 0.5
+    try:
+        c.read_ids(INFO_IDS)
+        c.read_id(Xcom_API.INFO_INPUT_VOLTAGE)
+        assert False, "breaker still closed"
+    except CircuitOpenError:
+        pass
+    assert c.breaker.stats()["state"] == "open"
+    sim.stop()
+
+
+def check_poller():
+    # Poller mit Sweeps ueber den PriorityScheduler wie in xtenderweb, 20 % der Requests ohne Antwort
+    sim = simulator(drop_rate=0.2, seed=2)
+    c = xcom232(port=sim.port, timeout=0.1)
+    bus = PriorityScheduler(c)
+    values = {id: [] for id in INFO_IDS}
+    failed = []
+
+    def update(item):
+        if item.ok:
+            values[item.id].append(item.value)
+        else:
+            failed.append(item.id)
+
+    p = PollScheduler(lambda id: bus.read_id(id, PRIORITY_POLL), lambda ids: bus.submit(PRIORITY_POLL, c.read_ids, ids),
+                      max_sweep=4)
+    for id in INFO_IDS:
+        p.add(id, 0.2, update)
+    p.start()
+    # Schreibzugriffe kommen zwischen den Sweeps dran und werden bei fehlender Antwort wiederholt
+    for i in range(5):
+        time.sleep(0.2)
+        assert bus.write_id(Xcom_API.PARA_BATTERY_CHARGE_CURRENT, float(i)) == 'value_set'
+    time.sleep(0.5)
+    p.stop()
+    assert all(values[id] for id in INFO_IDS), {id: len(v) for id, v in values.items()}
+    assert failed, "drop_rate without failed reads"
+    assert p.stats()["sweeps"] > 0
+    sim.stop()
+
+
+if __name__ == '__main__':
+    for check in (check_read, check_write, check_scom_error, check_gateway_busy, check_drop, check_poller):
+        start = time.monotonic()
+        check()
+        print("%-20s ok  %.2f s" % (check.__name__, time.monotonic() - start))
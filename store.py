@@ -0,0 +1,207 @@
+#Modul store, dauerhafte Speicherung der gepollten Werte in SQLite (WAL)
+#
+#   s = SampleStore('xtender.db')
+#   s.start()
+#   s.append(3011, time.time(), 230.1)          -> landet im Speicher, geschrieben wird gesammelt
+#   s.query(3011, t_from, t_to, points=500)     -> Rohwerte oder Rollups (1 min / 15 min / 1 h), je nach Zeitraum
+#
+#Samples werden gepuffert und alle flush_interval s oder ab flush_samples Samples in einer Transaktion geschrieben,
+#die SD-Karte sieht also wenige grosse Schreibzugriffe. Die Rollups werden bei jedem Flush inkrementell nachgefuehrt
+#(min / max / Summe / Anzahl pro Intervall), alte Daten werden nach retention geloescht.
+
+import sqlite3
+import threading
+import time
+
+# Aufloesung in s : Tabelle, 0 = Rohwerte
+RESOLUTIONS = (0, 60, 900, 3600)
+TABLES = {0: "samples", 60: "rollup_1min", 900: "rollup_15min", 3600: "rollup_1h"}
+
+# Aufbewahrung in s pro Aufloesung, None = unbegrenzt
+RETENTION = {0: 7 * 86400, 60: 90 * 86400, 900: 2 * 365 * 86400, 3600: None}
+
+
+class SampleStore(object):
+    # raw_interval: typischer Abstand der Rohwerte in s, fuer die Wahl der Aufloesung in query()
+    def __init__(self, path, flush_interval=60.0, flush_samples=2000, retention=None, raw_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_samples = flush_samples
+        self.retention = dict(RETENTION)
+        self.retention.update(retention or {})
+        self.raw_interval = raw_interval
+        self.pending = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        # die Datenbank wird erst beim ersten Zugriff (start, flush, query) geoeffnet, nicht schon beim Import
+        self.db = None
+        self.db_lock = threading.Lock()
+        self.reader = None
+        self.reader_lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.flushes = 0
+        self.written = 0
+        self.duplicates = 0
+        self.__next_retention = 0.0
+
+    def __connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        # NORMAL reicht im WAL Modus, ein Stromausfall kostet hoechstens den letzten Flush
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def open(self):
+        with self.db_lock:
+            if self.db is not None:
+                return
+            self.db = self.__connect()
+            self.__create()
+        with self.reader_lock:
+            self.reader = self.__connect()
+
+    def __create(self):
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS samples (id INTEGER, t INTEGER, v REAL, PRIMARY KEY (id, t)) WITHOUT ROWID")
+            for resolution in RESOLUTIONS[1:]:
+                self.db.execute("CREATE TABLE IF NOT EXISTS %s (id INTEGER, t INTEGER, min REAL, max REAL, sum REAL, count INTEGER, "
+                                "PRIMARY KEY (id, t)) WITHOUT ROWID" % TABLES[resolution])
+
+    # timestamp in s wie time.time(), nur Zahlen werden gespeichert
+    def append(self, id, timestamp, value):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return
+        with self.lock:
+            self.pending.append((id, int(timestamp * 1000), float(value)))
+            if len(self.pending) >= self.flush_samples:
+                self.wakeup.set()
+
+    def start(self):
+        self.open()
+        self.running = True
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.db is None:
+            return
+        self.flush()
+        self.db.close()
+        self.reader.close()
+
+    def __run(self):
+        while self.running:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print("Error store flush", repr(e))
+
+    @staticmethod
+    def __rollup(batch, resolution):
+        # (id, Intervallbeginn) -> [min, max, sum, count] fuer die Samples dieses Flushs
+        width = resolution * 1000
+        buckets = {}
+        for id, t, v in batch:
+            key = (id, t - t % width)
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [v, v, v, 1]
+            else:
+                if v < bucket[0]:
+                    bucket[0] = v
+                if v > bucket[1]:
+                    bucket[1] = v
+                bucket[2] += v
+                bucket[3] += 1
+        return [(id, t, b[0], b[1], b[2], b[3]) for (id, t), b in buckets.items()]
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return 0
+        self.open()
+        with self.db_lock, self.db:
+            # nur neue Samples gehen in die Rollups, ein doppeltes (id, t) wuerde dort sonst zweimal gezaehlt
+            execute = self.db.execute
+            inserted = [row for row in batch if execute("INSERT OR IGNORE INTO samples VALUES (?, ?, ?)", row).rowcount]
+            for resolution in RESOLUTIONS[1:]:
+                self.db.executemany("INSERT INTO %s VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id, t) DO UPDATE SET "
+                                    "min = min(min, excluded.min), max = max(max, excluded.max), sum = sum + excluded.sum, "
+                                    "count = count + excluded.count" % TABLES[resolution],
+                                    SampleStore.__rollup(inserted, resolution))
+            if time.monotonic() >= self.__next_retention:
+                self.__apply_retention()
+                self.__next_retention = time.monotonic() + 3600.0
+        self.flushes += 1
+        self.written += len(inserted)
+        self.duplicates += len(batch) - len(inserted)
+        return len(inserted)
+
+    def __apply_retention(self):
+        now = int(time.time() * 1000)
+        for resolution, keep in self.retention.items():
+            if keep is not None:
+                self.db.execute("DELETE FROM %s WHERE t < ?" % TABLES[resolution], (now - int(keep * 1000),))
+
+    # waehlt die feinste Aufloesung, bei der der Zeitraum hoechstens points Werte hat
+    def resolution(self, t_from, t_to, points):
+        span = (t_to - t_from) / 1000.0
+        for resolution in RESOLUTIONS:
+            if span / (resolution or self.raw_interval) <= points:
+                return resolution
+        return RESOLUTIONS[-1]
+
+    # juengster Zeitstempel einer ID in ms (auch noch nicht geschriebene Samples), None wenn es nichts gibt
+    def newest(self, id):
+        with self.lock:
+            pending = [t for i, t, v in self.pending if i == id]
+        self.open()
+        newest = None
+        with self.reader_lock:
+            for resolution in RESOLUTIONS:
+                newest = self.reader.execute("SELECT max(t) FROM %s WHERE id = ?" % TABLES[resolution], (id,)).fetchone()[0]
+                if newest is not None:
+                    break
+        return max(pending + ([newest] if newest is not None else [])) if pending or newest is not None else None
+
+    # t_from / t_to in ms, Ergebnis wie history.History.query, dazu die verwendete Aufloesung in s
+    # Samples, die noch auf den naechsten Flush warten, sind enthalten
+    def query(self, id, t_from, t_to, points=500):
+        resolution = self.resolution(t_from, t_to, points)
+        with self.lock:
+            pending = [sample for sample in self.pending if sample[0] == id and t_from <= sample[1] <= t_to]
+        self.open()
+        with self.reader_lock:
+            if resolution == 0:
+                rows = self.reader.execute("SELECT t, v, v, v, 1 FROM samples WHERE id = ? AND t BETWEEN ? AND ?",
+                                           (id, t_from, t_to)).fetchall()
+            else:
+                rows = self.reader.execute("SELECT t, min, max, sum, count FROM %s WHERE id = ? AND t BETWEEN ? AND ?"
+                                           % TABLES[resolution], (id, t_from - resolution * 1000 + 1, t_to)).fetchall()
+        buckets = {row[0]: list(row[1:]) for row in rows}
+        if resolution == 0:
+            for _, t, v in pending:
+                buckets[t] = [v, v, v, 1]
+        else:
+            for _, t, vmin, vmax, vsum, count in SampleStore.__rollup(pending, resolution):
+                bucket = buckets.get(t)
+                if bucket is None:
+                    buckets[t] = [vmin, vmax, vsum, count]
+                else:
+                    buckets[t] = [min(bucket[0], vmin), max(bucket[1], vmax), bucket[2] + vsum, bucket[3] + count]
+        keys = sorted(buckets)
+        return {"id": id, "resolution": resolution, "t": keys, "min": [buckets[t][0] for t in keys],
+                "max": [buckets[t][1] for t in keys], "mean": [buckets[t][2] / buckets[t][3] for t in keys]}
+
+    def stats(self):
+        with self.lock:
+            pending = len(self.pending)
+        return {"pending": pending, "flushes": self.flushes, "written": self.written, "duplicates": self.duplicates}
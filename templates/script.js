@@ -9,16 +9,7 @@
            return response.json() ;
         } )
         .then( json => {
-              document.querySelector("#id3011v").textContent = json.id3011.value;
-              document.querySelector("#id3011n").textContent = json.id3011.name;
-              document.querySelector("#id3011u").textContent = json.id3011.unit;
-              document.querySelector("#id3022v").textContent = json.id3022.value;
-              document.querySelector("#id3022n").textContent = json.id3022.name;
-              document.querySelector("#id3022u").textContent = json.id3022.unit;
-              //console.log(json.id3011.value);
-
-              element = document.getElementById("button1") 
-              element.textContent = json.id3011.value;
+              show_values(json);
               console.log('Running ... ');
            } 
         )
@@ -26,7 +17,32 @@
            console.error('Error:', error);
         });
   }
-  update_list() ;
+
+
+  // schreibt alle uebergebenen Werte ("id3011": {value, name, unit}) in die Seite, fehlende Elemente werden ignoriert
+  function show_values(values)
+  {
+     for (const [key, entry] of Object.entries(values))
+     {
+        for (const [suffix, field] of [["v", "value"], ["n", "name"], ["u", "unit"]])
+        {
+           element = document.querySelector("#" + key + suffix);
+           if (element)
+              element.textContent = entry[field];
+        }
+        if (key == "id3011")
+           document.getElementById("button1").textContent = entry.value;
+     }
+  }
+
+
+  // Push ueber Server-Sent Events, der Browser verbindet sich selbst neu und schickt dabei Last-Event-ID
+  function listen_events()
+  {
+     source = new EventSource("events");
+     source.onmessage = (event) => show_values(JSON.parse(event.data).values);
+     source.onerror = (error) => console.error('Error events:', error);
+  }
 
 
   function update_u_eingang()
@@ -104,7 +120,13 @@
 
 
 
-  setInterval( update_list, 5000 ) ;
+  if (window.EventSource)
+     listen_events() ;
+  else
+  {
+     update_list() ;
+     setInterval( update_list, 5000 ) ;
+  }
   //setInterval( update_u_eingang, 3000 ) ;
   //setInterval( update_all, 3000 ) ;
 
@@ -0,0 +1,125 @@
+#Modul topology, mehrere Geraete hinter einem Xcom Gateway (parallele / 3-phasige Xtender, VarioTrack, VarioString, BSP)
+#
+#   t = Topology(xcom232(port='/dev/ttyUSB0'))
+#   t.discover()
+#   t.refresh()                 -> liest alle veralteten Werte, reihum ueber die Geraete
+#   t.aggregates()              -> Summen aus den gecachten Werten, ohne weitere Bus Zugriffe
+#
+#alle Geraete teilen sich den Transport, jedes Geraet bekommt eine transport.DeviceConnection mit eigener Zieladresse
+
+from api import Xcom_API
+from transport import DeviceConnection
+from xtender import xtender_obj, Sample
+import time
+
+# User-Infos der anderen Geraetefamilien (Studer Xcom Protokoll, Werte als Float)
+VT_BATTERY_VOLTAGE = 11000
+VT_BATTERY_CURRENT = 11001
+VT_PV_VOLTAGE = 11002
+VT_PV_POWER = 11004             # kW
+
+VS_BATTERY_VOLTAGE = 15000
+VS_BATTERY_CURRENT = 15001
+VS_PV_POWER = 15010             # kW
+
+BSP_BATTERY_VOLTAGE = 7000
+BSP_BATTERY_CURRENT = 7001
+BSP_STATE_OF_CHARGE = 7002
+BSP_POWER = 7003                # W
+
+# Familie : (Adressen, Objekt fuer die Erkennung, {Name: ID})
+FAMILIES = {
+    "xtender": (range(101, 110), "battery_voltage",
+                {"battery_voltage": Xcom_API.INFO_BATTERY_VOLTAGE, "battery_charge_current": Xcom_API.INFO_BATTERY_CHARGE_CURRENT,
+                 "input_power": Xcom_API.INFO_INPUT_POWER, "output_power": Xcom_API.INFO_OUTPUT_POWER}),
+    "variotrack": (range(301, 316), "battery_voltage",
+                   {"battery_voltage": VT_BATTERY_VOLTAGE, "battery_current": VT_BATTERY_CURRENT, "pv_voltage": VT_PV_VOLTAGE,
+                    "pv_power": VT_PV_POWER}),
+    "variostring": (range(701, 716), "battery_voltage",
+                    {"battery_voltage": VS_BATTERY_VOLTAGE, "battery_current": VS_BATTERY_CURRENT, "pv_power": VS_PV_POWER}),
+    "bsp": ((601,), "battery_voltage",
+            {"battery_voltage": BSP_BATTERY_VOLTAGE, "battery_current": BSP_BATTERY_CURRENT,
+             "state_of_charge": BSP_STATE_OF_CHARGE, "power": BSP_POWER}),
+}
+
+
+class Device(object):
+    # ein Geraet mit seinen Objekten, z.B. device.objects["pv_power"].value
+    def __init__(self, family, address, conn, max_age):
+        self.family = family
+        self.address = address
+        self.conn = conn
+        self.api = conn.api
+        self.objects = {name: xtender_obj(family + str(address) + "." + name, id, conn, max_age)
+                        for name, id in FAMILIES[family][2].items()}
+
+    def __repr__(self):
+        return "Device(%s, %d)" % (self.family, self.address)
+
+    # gecachter Wert ohne Bus Zugriff, None wenn noch nicht gelesen oder ein Fehlertext
+    def cached(self, name):
+        value = self.objects[name].sample.value
+        return value if isinstance(value, (int, float)) else None
+
+
+class Topology(object):
+    # conn ist der gemeinsame Transport (xcom232 / xcomtcp), max_age gilt fuer alle Objekte aller Geraete
+    def __init__(self, conn, max_age=5.0):
+        self.conn = conn
+        self.max_age = max_age
+        self.devices = []
+
+    # jede Adresse der Familien einmal anfragen, Geraete die mit einem Wert antworten werden uebernommen
+    def discover(self, families=None):
+        self.devices = []
+        for family in families or FAMILIES:
+            addresses, probe, objects = FAMILIES[family]
+            for address in addresses:
+                conn = DeviceConnection(self.conn, address)
+                try:
+                    value = conn.read_id(objects[probe])
+                except Exception as e:
+                    print("Error discover", family, address, repr(e))
+                    continue
+                # ein Fehlertext wie DEVICE_NOT_FOUND heisst: kein Geraet unter dieser Adresse
+                if isinstance(value, (int, float)):
+                    device = Device(family, address, conn, self.max_age)
+                    device.objects[probe].sample = Sample(value, time.time())
+                    self.devices.append(device)
+        return self.devices
+
+    def by_family(self, family):
+        return [d for d in self.devices if d.family == family]
+
+    # liest alle Objekte, die aelter als max_age sind, reihum ueber die Geraete (ein Objekt pro Geraet und Runde),
+    # so kommt kein Geraet zu kurz, wenn max_reads die Anzahl der Transaktionen begrenzt. Liefert die Anzahl der Reads.
+    def refresh(self, max_reads=None):
+        queues = [[o for o in d.objects.values() if not o.sample.timestamp or o.age > o.max_age] for d in self.devices]
+        reads = 0
+        while any(queues):
+            for queue in queues:
+                if not queue:
+                    continue
+                if max_reads is not None and reads >= max_reads:
+                    return reads
+                obj = queue.pop(0)
+                try:
+                    obj.refresh()
+                except Exception as e:
+                    print("Error refresh", obj.name, repr(e))
+                reads += 1
+        return reads
+
+    def __total(self, family, name):
+        values = [d.cached(name) for d in self.by_family(family)]
+        return sum(v for v in values if v is not None)
+
+    # Summen aus den gecachten Werten (kW), timestamp ist der aelteste beteiligte Messzeitpunkt
+    def aggregates(self):
+        timestamps = [o.sample.timestamp for d in self.devices for o in d.objects.values() if o.sample.timestamp]
+        return {"pv_power": self.__total("variotrack", "pv_power") + self.__total("variostring", "pv_power"),
+                "output_power": self.__total("xtender", "output_power"),
+                "input_power": self.__total("xtender", "input_power"),
+                "battery_power": self.__total("bsp", "power") / 1000.0,
+                "devices": len(self.devices),
+                "timestamp": min(timestamps) if timestamps else 0.0}
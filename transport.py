@@ -0,0 +1,487 @@
+#Modul transport, gemeinsame Bausteine fuer die Transporte (xcom232, xcomtcp, ...)
+
+from api import Xcom_API
+import collections
+import threading
+import time
+
+
+class _Flight(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    # gleichzeitige Aufrufe mit gleichem key werden zu einem Aufruf zusammengefasst, alle Wartenden bekommen dasselbe Ergebnis
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args):
+        with self.lock:
+            self.calls += 1
+            flight = self.flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self.flights[key] = flight
+                leader = True
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn(*args)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.event.set()
+
+    def stats(self):
+        with self.lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self.flights)}
+
+
+PRIORITY_CONTROL = 0        # Schreibzugriffe von Regelungen
+PRIORITY_INTERACTIVE = 1    # Reads fuer HTTP Requests und Skripte
+PRIORITY_POLL = 2           # Hintergrund Polling
+
+PRIORITY_NAMES = {PRIORITY_CONTROL: "control", PRIORITY_INTERACTIVE: "interactive", PRIORITY_POLL: "poll"}
+
+
+class _Request(object):
+    __slots__ = ("priority", "fn", "args", "queued", "event", "result", "error")
+
+    def __init__(self, priority, fn, args):
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.queued = time.monotonic()
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _ClassStats(object):
+    def __init__(self, max_delay, window):
+        self.max_delay = max_delay
+        self.count = 0
+        self.expired = 0
+        self.waits = collections.deque(maxlen=window)
+
+    def snapshot(self):
+        waits = sorted(self.waits)
+        def percentile(p):
+            return waits[min(int(p * len(waits)), len(waits) - 1)] if waits else 0.0
+        return {"count": self.count, "expired": self.expired, "max_delay": self.max_delay,
+                "wait_p50": percentile(0.5), "wait_p99": percentile(0.99), "wait_max": waits[-1] if waits else 0.0}
+
+
+class PriorityScheduler(object):
+    # ein Worker Thread besitzt den Transport, pro Transaktion wird die hoechste Prioritaet zuerst bedient
+    # (Preemption an Frame Grenzen). Requests, die laenger als max_delay ihrer Klasse warten, werden mit TimeoutError verworfen.
+    def __init__(self, conn, max_delay=None, window=1024):
+        self.conn = conn
+        self.api = conn.api
+        delays = {PRIORITY_CONTROL: None, PRIORITY_INTERACTIVE: 2.0, PRIORITY_POLL: 30.0}
+        delays.update(max_delay or {})
+        self.classes = {p: _ClassStats(delays[p], window) for p in PRIORITY_NAMES}
+        self.queues = {p: collections.deque() for p in PRIORITY_NAMES}
+        self.reads = {}         # id -> _Request, wartende oder laufende Reads, gleiche IDs teilen sich einen Request
+        self.coalesced = 0
+        self.promoted = 0
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self.__worker, daemon=True)
+        self.thread.start()
+
+    def submit(self, priority, fn, *args):
+        request = _Request(priority, fn, args)
+        with self.cond:
+            self.queues[priority].append(request)
+            self.cond.notify()
+        request.event.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    # gleiche Reads teilen sich einen Platz in der Queue, unabhaengig von der Klasse. Kommt ein Aufrufer mit hoeherer Prioritaet
+    # dazu, rueckt der wartende Request in dessen Queue, sonst wartet z.B. ein HTTP Request hinter dem ganzen Polling.
+    # Wie bei SingleFlight, aber unter self.cond, damit Beitreten und Hochstufen atomar mit der Queue passieren.
+    def read_id(self, id:int, priority=PRIORITY_INTERACTIVE):
+        with self.cond:
+            request = self.reads.get(id)
+            if request is None:
+                request = self.reads[id] = _Request(priority, self.conn.read_id, (id,))
+                self.queues[priority].append(request)
+                self.cond.notify()
+            else:
+                self.coalesced += 1
+                if priority < request.priority:
+                    try:
+                        self.queues[request.priority].remove(request)
+                    except ValueError:
+                        pass    # laeuft schon
+                    else:
+                        # die Wartezeit zaehlt ab dem Hochstufen, sonst greift sofort max_delay der hoeheren Klasse
+                        request.priority = priority
+                        request.queued = time.monotonic()
+                        self.queues[priority].append(request)
+                        self.promoted += 1
+        request.event.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def write_id(self, id:int, data, priority=PRIORITY_CONTROL):
+        return self.submit(priority, self.conn.write_id, id, data)
+
+    def __next(self):
+        for priority in sorted(self.queues):
+            if self.queues[priority]:
+                return self.queues[priority].popleft()
+        return None
+
+    def __worker(self):
+        while True:
+            with self.cond:
+                request = self.__next()
+                while request is None:
+                    self.cond.wait()
+                    request = self.__next()
+            stats = self.classes[request.priority]
+            wait = time.monotonic() - request.queued
+            stats.count += 1
+            stats.waits.append(wait)
+            if stats.max_delay is not None and wait > stats.max_delay:
+                stats.expired += 1
+                request.error = TimeoutError("request waited %.3f s in class %s" % (wait, PRIORITY_NAMES[request.priority]))
+            else:
+                try:
+                    request.result = request.fn(*request.args)
+                except BaseException as e:
+                    request.error = e
+            if request.fn == self.conn.read_id:
+                with self.cond:
+                    if self.reads.get(request.args[0]) is request:
+                        del self.reads[request.args[0]]
+            request.event.set()
+
+    def stats(self):
+        with self.cond:
+            result = {PRIORITY_NAMES[p]: c.snapshot() for p, c in self.classes.items()}
+            for p, q in self.queues.items():
+                result[PRIORITY_NAMES[p]]["queued"] = len(q)
+            result["reads"] = {"coalesced": self.coalesced, "promoted": self.promoted, "in_flight": len(self.reads)}
+        return result
+
+
+class LatencyHistogram(object):
+    # HDR-artige Buckets in us: bis 32 us exakt, darueber 16 lineare Unterbuckets pro Zweierpotenz (max. 6 % Fehler)
+    # record ist konstante Zeit (bit_length und ein Shift), Werte ueber max_value landen im letzten Bucket
+    SUB_BUCKETS = 16
+
+    def __init__(self, max_value=1 << 26):
+        self.max_value = max_value
+        self.counts = [0] * (self.__index(max_value) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def __index(self, value):
+        shift = max(value.bit_length() - 5, 0)
+        return shift * LatencyHistogram.SUB_BUCKETS + (value >> shift)
+
+    def __lower(self, index):
+        shift = max(index // LatencyHistogram.SUB_BUCKETS - 1, 0)
+        return (index - shift * LatencyHistogram.SUB_BUCKETS) << shift
+
+    def record(self, value):
+        value = min(int(value), self.max_value)
+        self.counts[self.__index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        rank = max(int(p * self.count + 0.5), 1)
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                # Mitte des Buckets, begrenzt durch den kleinsten und groessten gemessenen Wert
+                return max(min((self.__lower(index) + self.__lower(index + 1)) // 2, self.max), self.min)
+        return self.max
+
+    def snapshot(self):
+        # alle Zeiten in ms
+        return {"count": self.count, "min": (self.min or 0) / 1000.0, "max": self.max / 1000.0,
+                "mean": self.total / self.count / 1000.0 if self.count else 0.0,
+                "p50": self.percentile(0.5) / 1000.0, "p90": self.percentile(0.9) / 1000.0,
+                "p99": self.percentile(0.99) / 1000.0, "p999": self.percentile(0.999) / 1000.0}
+
+
+SERVICE_NAMES = {1: "read", 2: "write"}
+
+
+class BusMetrics(object):
+    # Latenz pro Service und pro Objekt-ID, Fehlerzaehler und Bytes auf der Leitung eines Transports
+    # die Auslastung bezieht sich auf die theoretische Kapazitaet der Baudrate (8E1 = 11 Bit pro Byte)
+    def __init__(self, baudrate=115200, bits_per_byte=11, decoder=None):
+        self.baudrate = baudrate
+        self.bits_per_byte = bits_per_byte
+        self.decoder = decoder
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.services = {}
+            self.objects = {}
+            self.transactions = 0
+            self.timeouts = 0
+            self.errors = 0
+            self.retries = 0
+            self.tx_bytes = 0
+            self.rx_bytes = 0
+            self.busy = 0.0
+            self.start = time.monotonic()
+
+    # request / answer sind die Frames, Service (Byte 15) und Objekt-ID (Byte 18..21) kommen aus dem Request
+    def record(self, request, answer, latency):
+        service = request[15]
+        id = int.from_bytes(request[18:22], 'little')
+        us = latency * 1e6
+        with self.lock:
+            histogram = self.services.get(service)
+            if histogram is None:
+                histogram = self.services[service] = LatencyHistogram()
+            histogram.record(us)
+            histogram = self.objects.get(id)
+            if histogram is None:
+                histogram = self.objects[id] = LatencyHistogram()
+            histogram.record(us)
+            self.transactions += 1
+            if answer[14] & 0x01:
+                # Antwort mit Error-Flag
+                self.errors += 1
+            self.tx_bytes += len(request)
+            self.rx_bytes += len(answer)
+            self.busy += latency
+
+    def timeout(self, request, latency):
+        with self.lock:
+            self.timeouts += 1
+            self.tx_bytes += len(request)
+            self.busy += latency
+
+    def retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def snapshot(self, objects=True):
+        with self.lock:
+            elapsed = max(time.monotonic() - self.start, 1e-9)
+            wire = (self.tx_bytes + self.rx_bytes) * self.bits_per_byte
+            result = {"elapsed": elapsed, "transactions": self.transactions, "timeouts": self.timeouts,
+                      "errors": self.errors, "retries": self.retries,
+                      "checksum_errors": self.decoder.checksum_errors if self.decoder is not None else 0,
+                      "dropped_bytes": self.decoder.dropped_bytes if self.decoder is not None else 0,
+                      "tx_bytes": self.tx_bytes, "rx_bytes": self.rx_bytes,
+                      "utilisation": 100.0 * wire / (elapsed * self.baudrate),
+                      "busy": 100.0 * self.busy / elapsed,
+                      "services": {SERVICE_NAMES.get(s, str(s)): h.snapshot() for s, h in self.services.items()}}
+            if objects:
+                result["objects"] = {id: h.snapshot() for id, h in self.objects.items()}
+        return result
+
+
+ERROR_GATEWAY_BUSY = 0x0013     # SCOM_ERROR_GATEWAY_BUSY, das Gateway kann die Anfrage gerade nicht annehmen
+
+
+class GatewayBusyError(ConnectionError):
+    pass
+
+
+def gateway_busy(frame):
+    # Antwort mit Error-Flag und dem Fehlercode SCOM_ERROR_GATEWAY_BUSY im Datenteil (Byte 24..25)
+    return frame[14] != 2 and len(frame) == 28 and frame[24] | frame[25] << 8 == ERROR_GATEWAY_BUSY
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+class CircuitBreaker(object):
+    # nach failure_threshold Fehlern in Folge ist der Link "offen" und Aufrufe scheitern sofort,
+    # nach reset_timeout darf ein einzelner Aufruf testen (half-open), bei Erfolg ist der Link wieder geschlossen
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0, name="link"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.lock = threading.Lock()
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self.__open_until = 0.0
+
+    def allow(self):
+        with self.lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return
+            if self.state == CircuitBreaker.OPEN and time.monotonic() >= self.__open_until:
+                self.state = CircuitBreaker.HALF_OPEN
+                return
+            self.rejected += 1
+            raise CircuitOpenError("%s is down, next try in %.1f s" % (self.name, max(self.__open_until - time.monotonic(), 0.0)))
+
+    def success(self):
+        with self.lock:
+            self.state = CircuitBreaker.CLOSED
+            self.failures = 0
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == CircuitBreaker.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CircuitBreaker.OPEN:
+                    self.opened += 1
+                self.state = CircuitBreaker.OPEN
+                self.__open_until = time.monotonic() + self.reset_timeout
+
+    def stats(self):
+        with self.lock:
+            return {"state": self.state, "failures": self.failures, "opened": self.opened, "rejected": self.rejected}
+
+
+class RateLimitError(ConnectionError):
+    pass
+
+
+class TokenBucket(object):
+    # hoechstens rate Aufrufe pro s im Mittel, burst auf einmal
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.__last = time.monotonic()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.tokens + (now - self.__last) * self.rate, self.burst)
+            self.__last = now
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+class ReadThrough(object):
+    # Cache vor dem Bus, z.B. fuer HTTP Anfragen: put() bekommt die Werte vom Poller, get() liefert den Cache,
+    # wenn er nicht aelter als max_age ist, sonst einen Read ueber read (z.B. PriorityScheduler.read_id).
+    # Gleichzeitige Reads einer ID werden zusammengefasst, Reads auf Anfrage sind auf rate pro s begrenzt,
+    # darueber gibt es den alten Wert aus dem Cache oder RateLimitError.
+    def __init__(self, read, rate=2.0, burst=5):
+        self.read = read
+        self.bucket = TokenBucket(rate, burst)
+        self.flights = SingleFlight()
+        self.lock = threading.Lock()
+        self.values = {}        # id -> (Wert, time.time())
+        self.hits = 0
+        self.reads = 0
+        self.limited = 0
+
+    def put(self, id, value, timestamp):
+        with self.lock:
+            cached = self.values.get(id)
+            if cached is None or cached[1] <= timestamp:
+                self.values[id] = (value, timestamp)
+
+    # (Wert, Zeitstempel)
+    def get(self, id, max_age=5.0):
+        with self.lock:
+            cached = self.values.get(id)
+            if cached is not None and time.time() - cached[1] <= max_age:
+                self.hits += 1
+                return cached
+        return self.flights.do(id, self.__fetch, id, cached)
+
+    def __fetch(self, id, cached):
+        if not self.bucket.take():
+            with self.lock:
+                self.limited += 1
+            if cached is not None:
+                return cached
+            raise RateLimitError("on-demand reads limited to %.1f per s" % self.bucket.rate)
+        timestamp = time.time()
+        value = self.read(id)
+        with self.lock:
+            self.reads += 1
+        self.put(id, value, timestamp)
+        return value, timestamp
+
+    def stats(self):
+        with self.lock:
+            result = {"ids": len(self.values), "hits": self.hits, "reads": self.reads, "limited": self.limited}
+        result.update(self.flights.stats())
+        return result
+
+
+class DeviceConnection(object):
+    # ein weiteres Geraet (andere Zieladresse) ueber einen vorhandenen Transport mit request(frame), z.B. xcom232 oder xcomtcp
+    # gleiche Schnittstelle wie xcom232 (api, port, read_id, write_id). IDs, die Xcom_API nicht kennt (VarioTrack, VarioString,
+    # BSP), werden als User-Info mit Float-Wert gelesen.
+    def __init__(self, conn, destination):
+        self.conn = conn
+        self.port = conn.port
+        self.destination = destination
+        self.api = Xcom_API(crc=True, source=conn.api.get_source_address(), destination=destination)
+        self.flights = conn.flights
+
+    def read_id(self, id:int):
+        return self.flights.do((self.destination, id), self.__read_id, id)
+
+    def __read_id(self, id:int):
+        try:
+            frame = self.api.get_read_frame(id)
+        except ValueError:
+            frame = None
+        # Reads mit der kurzen Deadline des Transports, wie dessen eigenes read_id
+        deadline = getattr(self.conn, "read_deadline", None)
+        if frame is not None:
+            result = self.api.get_data_from_frame(self.conn.request(frame, deadline))
+        else:
+            frame = self.api.get_read_frame_ext(Xcom_API._object_type_info, id, Xcom_API._property_id_value)
+            result = self.api.get_data_from_frame_ext(self.conn.request(frame, deadline), Xcom_API._format_float)
+        if result[0] == True:
+            return self.api.get_text_from_error_id(result[1])
+        else:
+            return result[1]
+
+    def write_id(self, id:int, data):
+        return self.api.get_data_from_frame(self.conn.request(self.api.get_write_frame(id, data)))[1]
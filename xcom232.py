@@ -1,65 +1,199 @@
-from api import Xcom_API
+from api import Xcom_API, FrameDecoder
+from transport import SingleFlight, BusMetrics, CircuitBreaker, GatewayBusyError, gateway_busy
+from scomcapture import TX, RX
 import serial
+import select
+import termios
+import threading
+import time
 
 class xcom232(object):
-    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, timeout=1):      
+    # deadline: Zeit pro Aufruf inkl. Wiederholungen, backoff / max_backoff: Wartezeit zwischen den Versuchen (verdoppelt sich)
+    # read_deadline: dasselbe fuer Reads, Default timeout (ein Versuch, nur GATEWAY_BUSY wird darin wiederholt). Ein Read, der
+    # nicht antwortet, blockiert so z.B. den PriorityScheduler nicht fuer die ganze deadline, gepollt wird ohnehin wieder.
+    # nach failure_threshold Fehlversuchen in Folge scheitern Aufrufe sofort mit CircuitOpenError, bis reset_timeout vorbei ist
+    # weitere Geraete am selben Port (andere destination) ueber transport.DeviceConnection(conn, destination)
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, timeout=1, capture=None, deadline=3.0, backoff=0.05, max_backoff=1.0,
+                 failure_threshold=5, reset_timeout=10.0, destination=101, read_deadline=None):      
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        self.deadline = deadline
+        self.read_deadline = read_deadline if read_deadline is not None else timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.api = Xcom_API(crc=True, source=1, destination=destination)
+        self.decoder = FrameDecoder()
+        # der Bus ist halbduplex, immer nur eine Transaktion, gleichzeitige Reads derselben ID werden zusammengefasst
+        self.lock = threading.Lock()
+        self.flights = SingleFlight()
+        # optionaler Mitschnitt aller Frames (scomcapture.CaptureWriter)
+        self.capture = capture
+        # Latenzen, Fehler und Auslastung, self.metrics.snapshot()
+        self.metrics = BusMetrics(baudrate, decoder=self.decoder)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, port)
+        self.reconnects = 0
+        self.uart = None
+        try:
+            self.__open()
+        except serial.SerialException:
+            # z.B. USB Adapter noch nicht da, wird beim ersten Aufruf erneut versucht
+            print ("Error Uart open", self.port)
+
+    def __open(self):
         self.uart = serial.Serial(port=self.port, baudrate=self.baudrate, parity= serial.PARITY_EVEN, timeout=self.timeout)
-        self.api = Xcom_API(crc=True, source=1, destination=101)
 
+    def __close(self):
+        if self.uart is not None:
+            try:
+                self.uart.close()
+            except (serial.SerialException, OSError, termios.error):
+                pass
+            self.uart = None
+            self.reconnects += 1
 
-    def __transmit(self, data: str):
+    def __transmit(self, data: str, timeout):
+        start = time.monotonic()
         try:
             self.uart.write(data)
-            #data = uart.read_until(expected=b'\x0D\x0A', size=100)
-            #data = self.uart.read_until(expected=b'\x85Q', size=200)
-            data = self.uart.read(30)
-            #print(len(data))
-            return data
-        except:
-            print ("Error Uart __receive", self.port)
-            raise Exception 
-            return ""
+            if self.capture is not None:
+                self.capture.record(TX, data[6] | data[7] << 8, data)
+            frame = self.__receive(timeout)
+            if self.capture is not None:
+                self.capture.record(RX, data[6] | data[7] << 8, frame)
+            self.metrics.record(data, frame, time.monotonic() - start)
+            return frame
+        except TimeoutError:
+            self.metrics.timeout(data, time.monotonic() - start)
+            raise
+
+    # erst den 14 Byte Header lesen, dann genau data_length + 2 Bytes, alles innerhalb einer Deadline pro Transaktion
+    # gewartet wird mit select, so muss der uart timeout nicht bei jedem read umkonfiguriert werden
+    def __receive(self, timeout):
+        deadline = time.monotonic() + timeout
+        self.decoder.reset()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.uart], [], [], remaining)[0]:
+                raise TimeoutError("no complete frame from " + self.port)
+            data = self.uart.read(min(self.decoder.missing(), max(self.uart.in_waiting, 1)))
+            if not data:
+                # select meldet lesbar, aber es kommt nichts -> Adapter wurde entfernt
+                raise serial.SerialException("device reports readiness to read but returned no data")
+            frames = self.decoder.feed(data)
+            if frames:
+                return frames[0]
+
+    # eine Transaktion mit Wiederholungen: Timeouts, Fehler am Port (der Port wird neu geoeffnet) und SCOM_ERROR_GATEWAY_BUSY
+    # werden mit exponentiellem Backoff wiederholt, solange die Deadline des Aufrufs reicht (Default self.deadline).
+    # Liefert den Antwort-Frame.
+    def request(self, frame, deadline=None):
+        deadline = time.monotonic() + (self.deadline if deadline is None else deadline)
+        delay = self.backoff
+        while True:
+            self.breaker.allow()
+            try:
+                with self.lock:
+                    if self.uart is None:
+                        self.__open()
+                    self.uart.reset_input_buffer()
+                    self.uart.reset_output_buffer()
+                    answer = self.__transmit(frame, min(self.timeout, max(deadline - time.monotonic(), 0.01)))
+                # eine Antwort kam, der Link ist in Ordnung
+                self.breaker.success()
+                if gateway_busy(answer):
+                    raise GatewayBusyError("gateway busy on " + self.port)
+                return answer
+            except GatewayBusyError as e:
+                error = e
+            except (serial.SerialException, OSError, termios.error) as e:
+                # termios.error kommt von flush / tcsetattr, wenn der USB Adapter weg ist
+                error = e
+                if not isinstance(e, TimeoutError):
+                    with self.lock:
+                        self.__close()
+                self.breaker.failure()
+            if time.monotonic() + delay >= deadline:
+                raise error
+            self.metrics.retry()
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
 
     def read_id(self, id:int):
+        return self.flights.do(id, self.__read_id, id)
+
+    def __read_id(self, id:int):
         try:
-            if self.uart.isOpen():
-                self.uart.flushInput()
-                self.uart.flushOutput()
-                result = self.__transmit(self.api.get_read_frame(id))
-                result = self.api.get_data_from_frame(result)
-                if result[0] == True:
-                    return self.api.get_text_from_error_id(result[2]) #vml. besser mit raise Event ?
-                else:
-                    return result[1]
+            result = self.api.get_data_from_frame(self.request(self.api.get_read_frame(id), self.read_deadline))
+            if result[0] == True:
+                return self.api.get_text_from_error_id(result[1]) #vml. besser mit raise Event ?
             else:
-                return ""
+                return result[1]
         except:
             print("Error UART read_id : " + str(id) )
-            raise Exception
-            return ""
+            raise
+
+    # Sweep: mehrere IDs direkt hintereinander unter einem Lock, geflusht wird nur am Anfang und nach einem Timeout
+    # Ergebnis ist eine Liste mit (ok, Wert) bzw. (False, Fehlertext / Exception) in der Reihenfolge der ids
+    # nach max_timeouts Timeouts in Folge ist der Link vermutlich weg, der Rest des Sweeps wird ohne Bus als Fehler gemeldet
+    def read_ids(self, ids, max_timeouts=2):
+        self.breaker.allow()
+        results = []
+        timeouts = 0
+        try:
+            with self.lock:
+                if self.uart is None:
+                    self.__open()
+                self.uart.reset_input_buffer()
+                self.uart.reset_output_buffer()
+                for id in ids:
+                    if timeouts >= max_timeouts:
+                        results.append((False, TimeoutError("sweep aborted after %d timeouts on %s" % (timeouts, self.port))))
+                        continue
+                    try:
+                        frame = self.api.get_read_frame(id)
+                    except ValueError as e:
+                        results.append((False, e))
+                        continue
+                    try:
+                        result = self.api.get_data_from_frame(self.__transmit(frame, self.timeout))
+                    except TimeoutError as e:
+                        # eine verspaetete Antwort darf nicht dem naechsten Request zugeordnet werden
+                        self.uart.reset_input_buffer()
+                        self.breaker.failure()
+                        timeouts += 1
+                        results.append((False, e))
+                        continue
+                    self.breaker.success()
+                    timeouts = 0
+                    if result[0] == True:
+                        results.append((False, self.api.get_text_from_error_id(result[1])))
+                    else:
+                        results.append((True, result[1]))
+        except (serial.SerialException, OSError, termios.error):
+            print("Error UART read_ids")
+            with self.lock:
+                self.__close()
+            self.breaker.failure()
+            raise
+        return results
 
     def write_id(self, id:int, data):
         try:
-            if self.uart.isOpen():
-                self.uart.flushInput()
-                self.uart.flushOutput()
-                result = self.__transmit(self.api.get_write_frame(id), data)
-                return self.api.get_data_from_frame(result)[1]
-            else:
-                return ""
+            return self.api.get_data_from_frame(self.request(self.api.get_write_frame(id, data)))[1]
         except:
             print("Error UART write_id")
-            raise Exception
-            return ""
+            raise
+
+    # Anzahl der Reads und wie viele davon mit einem laufenden Read zusammengefasst wurden
+    def stats(self):
+        return self.flights.stats()
 
 
     def __del__(self):
         #print("del xcom object")
-        if self.uart.isOpen():
-            self.uart.close
+        if self.uart is not None and self.uart.isOpen():
+            self.uart.close()
         
 
 # \xaace\x00\x00\x00\x01\x00\x00\x00\x0e\x00\xd6J\x02\x01\x01\x00\xc3\x0b\x00\x00\x01\x00\x00\x00rC\x87U
@@ -0,0 +1,142 @@
+#Modul AsyncXcom232, asyncio Variante von xcom232
+#ein Event-Loop kann damit mehrere Gateways, den Scheduler und einen async Webserver bedienen, ohne Thread pro Port
+
+from api import Xcom_API, FrameDecoder
+from scomcapture import TX, RX
+from transport import BusMetrics, CircuitBreaker
+import asyncio
+import os
+import serial
+import termios
+
+
+class AsyncXcom232(object):
+    # der Port wird wie bei xcom232 erst bei Bedarf geoeffnet und nach EOF / Fehlern am Port neu geoeffnet,
+    # nach failure_threshold Fehlern in Folge scheitern Aufrufe sofort mit CircuitOpenError, bis reset_timeout vorbei ist
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, timeout=1, destination=101, capture=None, failure_threshold=5,
+                 reset_timeout=10.0):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.uart = None
+        self.fd = None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, port)
+        self.reconnects = 0
+        try:
+            self.__open()
+        except (serial.SerialException, OSError):
+            # z.B. USB Adapter noch nicht da, wird beim naechsten Aufruf erneut versucht
+            print ("Error Uart open", self.port)
+        self.api = Xcom_API(crc=True, source=1, destination=destination)
+        self.decoder = FrameDecoder()
+        # Transaktionen auf dem Bus sind halbduplex, immer nur eine gleichzeitig
+        self.lock = asyncio.Lock()
+        self.capture = capture
+        self.metrics = BusMetrics(baudrate, decoder=self.decoder)
+
+    def __open(self):
+        # timeout=0 -> pyserial oeffnet den Port non-blocking, gelesen wird ueber den Event-Loop
+        self.uart = serial.Serial(port=self.port, baudrate=self.baudrate, parity= serial.PARITY_EVEN, timeout=0)
+        self.fd = self.uart.fileno()
+
+    def __close(self):
+        if self.uart is not None:
+            try:
+                self.uart.close()
+            except (serial.SerialException, OSError, termios.error):
+                pass
+            self.uart = None
+            self.fd = None
+            self.reconnects += 1
+
+    def __on_readable(self, answer):
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.__fail(answer, e)
+            return
+        if not data:
+            # EOF, Adapter entfernt oder pty geschlossen. Der Reader bliebe sonst dauernd lesbar und der Loop liefe mit 100% CPU
+            self.__fail(answer, serial.SerialException("device reports readiness to read but returned no data"))
+            return
+        frames = self.decoder.feed(data)
+        if frames and not answer.done():
+            answer.set_result(frames[0])
+
+    def __fail(self, answer, error):
+        asyncio.get_running_loop().remove_reader(self.fd)
+        if not answer.done():
+            answer.set_exception(error)
+
+    async def __transmit(self, data):
+        self.breaker.allow()
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            try:
+                if self.uart is None:
+                    self.__open()
+                self.uart.reset_input_buffer()
+            except (serial.SerialException, OSError, termios.error):
+                print ("Error Uart open", self.port)
+                self.__close()
+                self.breaker.failure()
+                raise
+            self.decoder.reset()
+            answer = loop.create_future()
+            loop.add_reader(self.fd, self.__on_readable, answer)
+            start = loop.time()
+            broken = False
+            try:
+                self.uart.write(data)
+                if self.capture is not None:
+                    self.capture.record(TX, self.api.get_destination_address(), data)
+                frame = await asyncio.wait_for(answer, self.timeout)
+                if self.capture is not None:
+                    self.capture.record(RX, self.api.get_destination_address(), frame)
+                self.metrics.record(data, frame, loop.time() - start)
+                self.breaker.success()
+                return frame
+            except asyncio.TimeoutError:
+                self.metrics.timeout(data, loop.time() - start)
+                self.breaker.failure()
+                print ("Error Uart __receive", self.port)
+                raise
+            except (serial.SerialException, OSError, termios.error):
+                # EOF / Adapter weg, der Port wird beim naechsten Aufruf neu geoeffnet
+                broken = True
+                self.breaker.failure()
+                print ("Error Uart __receive", self.port)
+                raise
+            except:
+                print ("Error Uart __receive", self.port)
+                raise
+            finally:
+                if self.fd is not None:
+                    loop.remove_reader(self.fd)
+                if broken:
+                    self.__close()
+
+    async def read_id(self, id:int):
+        result = self.api.get_data_from_frame(await self.__transmit(self.api.get_read_frame(id)))
+        if result[0] == True:
+            return self.api.get_text_from_error_id(result[1])
+        else:
+            return result[1]
+
+    async def write_id(self, id:int, data):
+        result = await self.__transmit(self.api.get_write_frame(id, data))
+        return self.api.get_data_from_frame(result)[1]
+
+    def close(self):
+        if self.uart is not None and self.uart.isOpen():
+            self.uart.close()
+
+
+if __name__ == '__main__':
+    async def main():
+        c = AsyncXcom232(port='/dev/ttyUSB0')
+        print(await asyncio.gather(c.read_id(c.api.INFO_BATTERY_VOLTAGE), c.read_id(c.api.INFO_INPUT_VOLTAGE)))
+        c.close()
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+#Modul xcomtcp, TCP Transport fuer Xcom-LAN oder Seriell-Ethernet Bridges, gleiche Schnittstelle wie xcom232
+#
+#   c = xcomtcp('192.168.1.50', 4001)
+#   c.read_id(c.api.INFO_BATTERY_VOLTAGE)
+#
+#mehrere Gateways teilen sich ueber XcomTcpPool persistente Verbindungen, pro Gateway genau eine (der SCOM Bus dahinter
+#ist halbduplex), weitere Zieladressen am selben Gateway laufen als transport.DeviceConnection ueber diese Verbindung
+
+from api import Xcom_API, FrameDecoder
+from transport import SingleFlight, BusMetrics, DeviceConnection, GatewayBusyError, gateway_busy
+from scomcapture import TX, RX
+import socket
+import threading
+import time
+
+
+class xcomtcp(object):
+    # backoff / max_backoff: Wartezeit bis zum naechsten Verbindungsaufbau nach einem Fehler (verdoppelt sich)
+    # deadline / read_deadline / retry_backoff / retry_max_backoff wie deadline / read_deadline / backoff / max_backoff bei xcom232
+    def __init__(self, host, port=4001, timeout=1, destination=101, backoff=0.5, max_backoff=30.0, capture=None, deadline=3.0,
+                 read_deadline=None, retry_backoff=0.05, retry_max_backoff=1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.read_deadline = read_deadline if read_deadline is not None else timeout
+        self.retry_backoff = retry_backoff
+        self.retry_max_backoff = retry_max_backoff
+        self.api = Xcom_API(crc=True, source=1, destination=destination)
+        self.decoder = FrameDecoder()
+        self.lock = threading.Lock()
+        self.flights = SingleFlight()
+        self.sock = None
+        self.capture = capture
+        # Latenzen inklusive Netzwerk, die Auslastung bezieht sich auf den seriellen Bus hinter dem Gateway
+        self.metrics = BusMetrics(decoder=self.decoder)
+        self.reconnects = 0
+        self.__delay = 0.0
+        self.__next_connect = 0.0
+
+    def __connect(self):
+        # nach einem Fehler erst wieder nach der Backoff Zeit verbinden, sonst sofort Fehler
+        if time.monotonic() < self.__next_connect:
+            raise ConnectionError("reconnect to %s:%d in backoff" % (self.host, self.port))
+        try:
+            self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            self.__delay = 0.0
+        except OSError:
+            self.__fail()
+            raise
+
+    def __fail(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            self.reconnects += 1
+        self.__delay = min(max(self.__delay * 2, self.backoff), self.max_backoff)
+        self.__next_connect = time.monotonic() + self.__delay
+
+    # alte Bytes im Empfangspuffer verwerfen (wie flushInput bei xcom232)
+    def __drain(self):
+        self.sock.setblocking(False)
+        try:
+            while self.sock.recv(4096):
+                pass
+            # recv liefert b'' -> Gegenseite hat geschlossen
+            raise ConnectionError("connection closed by %s:%d" % (self.host, self.port))
+        except BlockingIOError:
+            pass
+        finally:
+            self.sock.setblocking(True)
+
+    def __transmit(self, data, timeout):
+        with self.lock:
+            start = time.monotonic()
+            deadline = start + timeout
+            try:
+                if self.sock is None:
+                    self.__connect()
+                self.__drain()
+                self.decoder.reset()
+                self.sock.settimeout(timeout)
+                self.sock.sendall(data)
+                if self.capture is not None:
+                    self.capture.record(TX, self.api.get_destination_address(), data)
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("no complete frame from %s:%d" % (self.host, self.port))
+                    self.sock.settimeout(remaining)
+                    chunk = self.sock.recv(4096)
+                    if not chunk:
+                        raise ConnectionError("connection closed by %s:%d" % (self.host, self.port))
+                    frames = self.decoder.feed(chunk)
+                    if frames:
+                        if self.capture is not None:
+                            self.capture.record(RX, self.api.get_destination_address(), frames[0])
+                        self.metrics.record(data, frames[0], time.monotonic() - start)
+                        return frames[0]
+            except (socket.timeout, TimeoutError):
+                self.metrics.timeout(data, time.monotonic() - start)
+                raise TimeoutError("no complete frame from %s:%d" % (self.host, self.port))
+            except (ConnectionError, OSError):
+                # ein Fehler beim Verbinden ist in __connect schon behandelt
+                if self.sock is not None:
+                    self.__fail()
+                raise
+
+    # eine Transaktion mit einem fertigen Frame, liefert den Antwort-Frame (z.B. fuer transport.DeviceConnection)
+    # wie xcom232.request: Timeouts, Verbindungsfehler und SCOM_ERROR_GATEWAY_BUSY werden mit exponentiellem Backoff
+    # wiederholt, solange die Deadline des Aufrufs reicht (Default self.deadline)
+    def request(self, frame, deadline=None):
+        deadline = time.monotonic() + (self.deadline if deadline is None else deadline)
+        delay = self.retry_backoff
+        while True:
+            try:
+                answer = self.__transmit(frame, min(self.timeout, max(deadline - time.monotonic(), 0.01)))
+                if gateway_busy(answer):
+                    raise GatewayBusyError("gateway busy on %s:%d" % (self.host, self.port))
+                return answer
+            except (ConnectionError, OSError) as e:
+                # TimeoutError und GatewayBusyError sind auch OSError / ConnectionError
+                error = e
+            wait = delay
+            if self.sock is None:
+                # Verbindung weg, der naechste Versuch lohnt sich erst nach dem Reconnect Backoff
+                wait = max(delay, self.__next_connect - time.monotonic())
+            if time.monotonic() + wait >= deadline:
+                raise error
+            self.metrics.retry()
+            time.sleep(wait)
+            delay = min(delay * 2, self.retry_max_backoff)
+
+    def read_id(self, id:int):
+        return self.flights.do(id, self.__read_id, id)
+
+    def __read_id(self, id:int):
+        try:
+            result = self.api.get_data_from_frame(self.request(self.api.get_read_frame(id), self.read_deadline))
+            if result[0] == True:
+                return self.api.get_text_from_error_id(result[1])
+            else:
+                return result[1]
+        except:
+            print("Error TCP read_id : " + str(id), self.host)
+            raise
+
+    def write_id(self, id:int, data):
+        try:
+            return self.api.get_data_from_frame(self.request(self.api.get_write_frame(id, data)))[1]
+        except:
+            print("Error TCP write_id", self.host)
+            raise
+
+    def stats(self):
+        return self.flights.stats()
+
+    def close(self):
+        with self.lock:
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+    def __del__(self):
+        if self.sock is not None:
+            self.sock.close()
+
+
+class XcomTcpPool(object):
+    # eine persistente Verbindung pro Gateway (host, port), von allen Benutzern geteilt. Die Verbindung spricht die
+    # Zieladresse 101 an, andere Zieladressen bekommen eine DeviceConnection darauf (ein Lock, keine verschachtelten Frames)
+    def __init__(self, timeout=1, backoff=0.5, max_backoff=30.0, capture=None):
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.capture = capture
+        self.lock = threading.Lock()
+        self.connections = {}   # (host, port) -> xcomtcp
+        self.devices = {}       # (host, port, destination) -> DeviceConnection
+
+    def get(self, host, port=4001, destination=101):
+        with self.lock:
+            conn = self.connections.get((host, port))
+            if conn is None:
+                conn = xcomtcp(host, port, self.timeout, 101, self.backoff, self.max_backoff, self.capture)
+                self.connections[(host, port)] = conn
+            if destination == conn.api.get_destination_address():
+                return conn
+            device = self.devices.get((host, port, destination))
+            if device is None:
+                device = DeviceConnection(conn, destination)
+                self.devices[(host, port, destination)] = device
+            return device
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections.values():
+                conn.close()
+            self.connections.clear()
+            self.devices.clear()
+
+
+if __name__ == '__main__':
+    import sys
+    c = xcomtcp(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 4001)
+    print(c.read_id(c.api.INFO_BATTERY_VOLTAGE))
@@ -2,41 +2,184 @@
 
 #from os import name
 from xcom232 import xcom232
+from collections import namedtuple
+import os
+import threading
+import time
+
+
+# Umgang mit Werten, die aelter als max_age sind
+POLICY_CACHED = "cached"                        # immer den gespeicherten Wert liefern, gelesen wird nur beim ersten Zugriff oder mit refresh()
+POLICY_REFRESH = "refresh"                      # blockieren und neu lesen
+POLICY_STALE_WHILE_REFRESH = "stale-while-refresh"  # den alten Wert sofort liefern und im Hintergrund neu lesen
+
+Sample = namedtuple('Sample', ['value', 'timestamp'])
 
 
 class xtender_obj:
-    def __init__(self, name = "Objekt Name", id = 0, c = type(xcom232)):
+    # max_age in s, 0 = jeder Zugriff liest vom Bus (wie bisher)
+    def __init__(self, name = "Objekt Name", id = 0, c = type(xcom232), max_age = 0.0, policy = POLICY_REFRESH):
         self.name = name
         self.id = id
         self.c = c
+        self.max_age = max_age
+        self.policy = policy
+        self.sample = Sample(None, 0.0)     # letzter Wert mit Zeitpunkt der Messung (time.time())
+        self.__lock = threading.Lock()
+        self.__refreshing = False
+
     @property
-    def value(self):
-        return self.c.read_id(self.id)
+    def timestamp(self):
+        return self.sample.timestamp
+
+    @property
+    def age(self):
+        return time.time() - self.sample.timestamp
+
+    def refresh(self):
+        value = self.c.read_id(self.id)
+        self.sample = Sample(value, time.time())
+        return value
+
+    def __background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print("Error refresh", self.name, repr(e))
+        finally:
+            self.__refreshing = False
 
+    @property
+    def value(self):
+        sample = self.sample
+        if sample.timestamp and (self.policy == POLICY_CACHED or time.time() - sample.timestamp <= self.max_age):
+            return sample.value
+        if sample.timestamp and self.policy == POLICY_STALE_WHILE_REFRESH:
+            with self.__lock:
+                if not self.__refreshing:
+                    self.__refreshing = True
+                    threading.Thread(target=self.__background_refresh, daemon=True).start()
+            return sample.value
+        return self.refresh()
+
+    # write_id liefert 'value_set' oder den SCOM Fehlercode, nur ein bestaetigter Wert kommt in den Cache,
+    # sonst wird der Cache verworfen und der naechste Zugriff liest vom Bus
     @value.setter
     def value(self, val):
-        return self.c.write_id(self.id, val)
+        result = self.c.write_id(self.id, val)
+        if result == 'value_set':
+            self.sample = Sample(val, time.time())
+        else:
+            self.sample = Sample(None, 0.0)
+        return result
+
+
+class XtenderSnapshot(object):
+    # Ergebnis von Xtender.snapshot(): alle Werte eines Sweeps mit gemeinsamem Zeitstempel (Start des Sweeps, time.time())
+    # values / errors sind Tupel in der Reihenfolge von ids, errors[i] ist None wenn der Wert gueltig ist
+    __slots__ = ('timestamp', 'duration', 'ids', 'values', 'errors', '__index')
+
+    def __init__(self, timestamp, duration, ids, values, errors):
+        self.timestamp = timestamp
+        self.duration = duration
+        self.ids = ids
+        self.values = values
+        self.errors = errors
+        self.__index = {id: i for i, id in enumerate(ids)}
+
+    def __getitem__(self, id):
+        return self.values[self.__index[id]]
+
+    def __contains__(self, id):
+        return id in self.__index
+
+    def get(self, id, default=None):
+        i = self.__index.get(id)
+        if i is None or self.errors[i] is not None:
+            return default
+        return self.values[i]
+
+    def error(self, id):
+        return self.errors[self.__index[id]]
+
+    @property
+    def ok(self):
+        return all(e is None for e in self.errors)
+
+    def as_dict(self):
+        return {id: value for id, value, error in zip(self.ids, self.values, self.errors) if error is None}
 
 
 class Xtender:
-    def __init__(self):
+    # conn kann ein anderer Transport mit read_id / write_id sein, z.B. scombroker.ScomClient()
+    # ohne conn und mit XCOM_BROKER=<socket> (z.B. /tmp/xcom232.sock) geht alles ueber den Broker, sonst direkt auf den Port
+    # max_age / policy gelten fuer alle Objekte, mehrere Zugriffe innerhalb von max_age teilen sich einen Read
+    def __init__(self, conn = None, max_age = 1.0, policy = POLICY_REFRESH):
         print ("create Xtender")
-        self.conn = xcom232(port='/dev/ttyUSB0')
+        if conn is None and os.environ.get("XCOM_BROKER"):
+            from scombroker import ScomClient
+            conn = ScomClient(os.environ["XCOM_BROKER"])
+        self.conn = conn if conn is not None else xcom232(port='/dev/ttyUSB0')
+        self.max_age = max_age
+        self.policy = policy
         self.api = self.conn.api
         self.battery = self.__battery(self)
         self.input = self.__input(self)
+        # Gruppen fuer snapshot(), z.B. x.snapshot(["battery", x.api.INFO_OUTPUT_POWER])
+        self.groups = {"battery": self.battery, "input": self.input}
+
+    def __objects(self):
+        for group in self.groups.values():
+            for obj in vars(group).values():
+                if isinstance(obj, xtender_obj):
+                    yield obj
+
+    def __expand(self, ids_or_groups):
+        ids = []
+        for item in ids_or_groups:
+            if isinstance(item, str):
+                ids.extend(obj.id for obj in vars(self.groups[item]).values() if isinstance(obj, xtender_obj))
+            else:
+                ids.append(item)
+        # doppelte IDs nur einmal lesen
+        return tuple(dict.fromkeys(ids))
+
+    # liest alle IDs / Gruppen in einem Sweep (conn.read_ids, ein Lock, kein flush pro ID),
+    # die Werte landen auch im Cache der xtender_obj
+    def snapshot(self, ids_or_groups):
+        ids = self.__expand(ids_or_groups)
+        timestamp = time.time()
+        start = time.monotonic()
+        read_ids = getattr(self.conn, "read_ids", None)
+        if read_ids is not None:
+            results = read_ids(ids)
+        else:
+            results = []
+            for id in ids:
+                try:
+                    results.append((True, self.conn.read_id(id)))
+                except Exception as e:
+                    results.append((False, e))
+        duration = time.monotonic() - start
+        values = tuple(value if ok else None for ok, value in results)
+        errors = tuple(None if ok else value for ok, value in results)
+        for obj in self.__objects():
+            i = ids.index(obj.id) if obj.id in ids else -1
+            if i >= 0 and errors[i] is None:
+                obj.sample = Sample(values[i], timestamp)
+        return XtenderSnapshot(timestamp, duration, ids, values, errors)
 
     class __battery:
         def __init__(self, parrent):
-            self.temperatur = xtender_obj("Battery temperatur", parrent.api.INFO_BATTERY_TEMPERATURE, parrent.conn)
-            self.voltage = xtender_obj("Batterie Voltage", parrent.api.INFO_BATTERY_VOLTAGE, parrent.conn)
-            self.charge_current = xtender_obj("Batterie Charge Current", parrent.api.INFO_BATTERY_CHARGE_CURRENT, parrent.conn)
+            self.temperatur = xtender_obj("Battery temperatur", parrent.api.INFO_BATTERY_TEMPERATURE, parrent.conn, parrent.max_age, parrent.policy)
+            self.voltage = xtender_obj("Batterie Voltage", parrent.api.INFO_BATTERY_VOLTAGE, parrent.conn, parrent.max_age, parrent.policy)
+            self.charge_current = xtender_obj("Batterie Charge Current", parrent.api.INFO_BATTERY_CHARGE_CURRENT, parrent.conn, parrent.max_age, parrent.policy)
 
     class __input:
         def __init__(self, parrent):
-            self.voltage = xtender_obj("Battery temperatur", parrent.api.INFO_INPUT_VOLTAGE, parrent.conn)
-            self.current = xtender_obj("Battery temperatur", parrent.api.INFO_INPUT_CURRENT, parrent.conn)
-            self.frequency = xtender_obj("Battery temperatur", parrent.api.INFO_INPUT_FREQUENCY, parrent.conn)
+            self.voltage = xtender_obj("Battery temperatur", parrent.api.INFO_INPUT_VOLTAGE, parrent.conn, parrent.max_age, parrent.policy)
+            self.current = xtender_obj("Battery temperatur", parrent.api.INFO_INPUT_CURRENT, parrent.conn, parrent.max_age, parrent.policy)
+            self.frequency = xtender_obj("Battery temperatur", parrent.api.INFO_INPUT_FREQUENCY, parrent.conn, parrent.max_age, parrent.policy)
 
 
 if __name__ == '__main__':
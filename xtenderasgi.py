@@ -0,0 +1,186 @@
+#Modul xtenderasgi, ASGI Variante von xtenderweb ohne Threads
+#
+#   uvicorn xtenderasgi:app --host 0.0.0.0 --port 80 --loop asyncio
+#   XCOM_PORT=/dev/ttyUSB1 uvicorn xtenderasgi:app ...
+#
+#Webserver, Bus (AsyncXcom232) und Poller (PollScheduler.run_async) laufen im selben Event-Loop,
+#der Poller startet beim Lifespan Startup der Anwendung und nicht erst mit dem ersten Request.
+#Ein offener /events Stream kostet nur ein Future, so reichen viele Keep-Alive Clients auf einem Kern.
+#Poll-Liste, Ringpuffer, SampleStore und ChangeFeed kommen aus xtenderstate, SQLite laeuft im Executor, nie im Loop.
+
+from xcom232async import AsyncXcom232
+from poller import PollScheduler
+from xtenderstate import olist, init_poll_list, init_param_list, store, feed, query_history
+from urllib.parse import parse_qs
+import asyncio
+import jinja2
+import json
+import os
+import time
+
+PORT = os.environ.get("XCOM_PORT", "/dev/ttyUSB0")
+
+conn = None     # AsyncXcom232, Transaktionen laufen ueber dessen asyncio.Lock nacheinander
+poller = None
+tasks = []
+pages = {}      # gerenderte Templates, Pfad -> (Content-Type, Bytes)
+
+
+def render_pages():
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')))
+    env.globals["url_for"] = lambda endpoint, filename="": "/" + endpoint + "/" + filename
+    pages["/status"] = ("text/html; charset=utf-8", env.get_template('status.html').render().encode('utf-8'))
+    pages["/script.js"] = ("application/javascript", env.get_template('script.js').render().encode('utf-8'))
+
+
+# statt des Threads im SampleStore, der Flush selbst blockiert und laeuft deshalb im Executor
+async def flush_store():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(store.flush_interval)
+        try:
+            await loop.run_in_executor(None, store.flush)
+        except Exception as e:
+            print("Error store flush", repr(e))
+
+
+async def startup():
+    global conn, poller
+    render_pages()
+    await asyncio.get_running_loop().run_in_executor(None, store.open)
+    # fehlt der Port (noch), ist der Startup trotzdem fertig, AsyncXcom232 oeffnet ihn beim naechsten Read erneut
+    conn = AsyncXcom232(port=PORT)
+    init_poll_list(conn.api)
+    init_param_list(conn.api)
+    feed.publish({o.key(): o.entry() for o in olist})
+    # budget wie in xtenderweb: hoechstens 10 Reads pro s fuer das adaptive Polling
+    poller = PollScheduler(conn.read_id, budget=10.0)
+    for o in olist:
+        poller.add(o.id, o.refreshtime or None, o.update, min_interval=o.mintime, max_interval=o.maxtime, deadband=o.deadband)
+    tasks.append(asyncio.ensure_future(poller.run_async()))
+    tasks.append(asyncio.ensure_future(flush_store()))
+    print ("Poller gestartet")
+
+
+async def shutdown():
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    del tasks[:]
+    await asyncio.get_running_loop().run_in_executor(None, store.close)
+    if conn is not None:
+        conn.close()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await startup()
+            except Exception as e:
+                print ("Error startup", repr(e))
+                await send({"type": "lifespan.startup.failed", "message": repr(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def respond(send, status, body=b"", content_type=None, headers=None):
+    h = [(b"access-control-allow-origin", b"*")]
+    if content_type is not None:
+        h.append((b"content-type", content_type.encode('latin-1')))
+    for k, v in (headers or {}).items():
+        h.append((k.encode('latin-1'), v.encode('latin-1')))
+    await send({"type": "http.response.start", "status": status, "headers": h})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def respond_json(send, data):
+    await respond(send, 200, json.dumps(data, separators=(',', ':')).encode('utf-8'), "application/json")
+
+
+def arg(args, name, default):
+    try:
+        return int(args[name][0]) if name in args else default
+    except ValueError:
+        return default
+
+
+# wie xtenderweb /list: Body pro Generation gecacht, ETag, gzip und ?since=<gen>
+async def f_list(args, headers, send):
+    since = arg(args, "since", None)
+    generation, body, compressed = feed.document(since)
+    gzipped = "gzip" in headers.get(b"accept-encoding", b"").decode('latin-1')
+    tag = "g%d" % generation + ("-s%d" % since if since is not None else "") + ("-gz" if gzipped else "")
+    h = {"etag": '"%s"' % tag, "vary": "Accept-Encoding", "x-generation": str(generation)}
+    match = headers.get(b"if-none-match", b"").decode('latin-1')
+    if tag in [t.strip().replace('W/', '', 1).strip('"') for t in match.split(',')] or match.strip() == '*':
+        await respond(send, 304, headers=h)
+        return
+    if gzipped:
+        h["content-encoding"] = "gzip"
+    await respond(send, 200, compressed if gzipped else body, "application/json", h)
+
+
+async def f_history(args, send):
+    t_to = arg(args, "to", int(time.time() * 1000))
+    t_from = arg(args, "from", t_to - 3600 * 1000)
+    points = min(max(arg(args, "points", 500), 1), 5000)
+    # der SampleStore fragt SQLite ab, das darf den Loop (Bus, SSE Streams) nicht aufhalten
+    result = await asyncio.get_running_loop().run_in_executor(None, query_history, arg(args, "id", 3011), t_from, t_to, points)
+    await respond_json(send, result)
+
+
+async def f_metrics(send):
+    await respond_json(send, {"bus": conn.metrics.snapshot() if conn is not None else {},
+                              "poller": poller.stats() if poller is not None else {}, "store": store.stats(),
+                              "events": feed.stats()})
+
+
+# SSE wie xtenderweb /events, der Stream endet, sobald der Client die Verbindung schliesst
+async def f_events(args, headers, receive, send):
+    last = headers.get(b"last-event-id", b"").decode('latin-1') or (args["since"][0] if "since" in args else None)
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+                            (b"x-accel-buffering", b"no"), (b"access-control-allow-origin", b"*")]})
+
+    async def stream():
+        async for chunk in feed.astream(last):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    task = asyncio.ensure_future(stream())
+    try:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    path = scope["path"]
+    args = parse_qs(scope.get("query_string", b"").decode('latin-1'))
+    headers = dict(scope["headers"])
+    if path == "/list":
+        await f_list(args, headers, send)
+    elif path == "/events":
+        await f_events(args, headers, receive, send)
+    elif path == "/history":
+        await f_history(args, send)
+    elif path == "/metrics":
+        await f_metrics(send)
+    elif path in pages:
+        await respond(send, 200, pages[path][1], pages[path][0])
+    elif path == "/":
+        await respond(send, 200, b"Hello, World!", "text/plain")
+    else:
+        await respond(send, 404, b"Not Found", "text/plain")
@@ -0,0 +1,172 @@
+#Modul xtendersim, simuliert ein Xcom-232i mit Xtender hinter einem Pseudo-Terminal
+#
+#   python3 xtendersim.py            -> gibt den pty Namen aus, z.B. /dev/pts/3
+#   xcom232(port='/dev/pts/3')       -> funktioniert unveraendert gegen den Simulator
+#
+#beantwortet Read/Write Frames fuer alle IDs aus Xcom_API.__para_info_dict mit zeitlich veraenderlichen Werten,
+#Parameter koennen geschrieben werden, Latenz, Baudrate und Fehler (z.B. SCOM_ERROR_GATEWAY_BUSY) sind einstellbar
+
+from api import Xcom_API, FrameDecoder
+import math
+import os
+import pty
+import random
+import select
+import struct
+import threading
+import time
+import tty
+
+ERROR_DEVICE_NOT_FOUND = 0x0002
+ERROR_RESPONSE_TIMEOUT = 0x0003
+ERROR_GATEWAY_BUSY = 0x0013
+ERROR_OBJECT_ID_NOT_FOUND = 0x0022
+ERROR_PROPERTY_IS_READ_ONLY = 0x0025
+
+# id : (Mittelwert, Amplitude, Periode in s), Leistungen in kW wie vom Xtender geliefert
+PROFILES = {
+    Xcom_API.INFO_BATTERY_VOLTAGE: (51.2, 1.5, 600.0),
+    Xcom_API.INFO_BATTERY_TEMPERATURE: (22.0, 2.0, 3600.0),
+    Xcom_API.INFO_BATTERY_CHARGE_CURRENT: (10.0, 15.0, 300.0),
+    Xcom_API.INFO_BATTERY_VOLTAGE_RIPPLE: (0.2, 0.1, 60.0),
+    Xcom_API.INFO_STATE_OF_CHARGE: (75.0, 20.0, 7200.0),
+    Xcom_API.INFO_NUMBER_OF_BATTERY_ELEMENTS: (24.0, 0.0, 1.0),
+    Xcom_API.INFO_INPUT_VOLTAGE: (230.0, 3.0, 120.0),
+    Xcom_API.INFO_INPUT_CURRENT: (4.0, 3.0, 90.0),
+    Xcom_API.INFO_INPUT_FREQUENCY: (50.0, 0.05, 30.0),
+    Xcom_API.INFO_INPUT_POWER: (0.9, 0.7, 90.0),
+    Xcom_API.INFO_OUTPUT_VOLTAGE: (230.0, 1.0, 60.0),
+    Xcom_API.INFO_OUTPUT_CURRENT: (3.0, 2.5, 45.0),
+    Xcom_API.INFO_OUTPUT_FREQUENCY: (50.0, 0.02, 30.0),
+    Xcom_API.INFO_OUTPUT_POWER: (0.7, 0.6, 45.0),
+}
+
+# Startwerte der Parameter, alle anderen starten mit 0
+PARAMETERS = {
+    Xcom_API.PARA_MAXIMUM_CURRENT_OF_AC_SOURCE: 32.0,
+    Xcom_API.PARA_BATTERY_CHARGE_CURRENT: 60.0,
+    Xcom_API.PARA_SMART_BOOST_ALLOWED: 1,
+    Xcom_API.PARA_INVERTER_ALLOWED: 1,
+    Xcom_API.PARA_TYPE_OF_DETECTION_OF_GRID_LOSS: 1,
+    Xcom_API.PARA_CHARGER_ALLOWED: 1,
+    Xcom_API.PARA_AC_OUTPUT_VOLTAGE: 230.0,
+    Xcom_API.PARA_INVERTER_FREQUENCY: 50.0,
+    Xcom_API.PARA_TRANSFER_RELAY_ALLOWED: 1,
+    Xcom_API.PARA_LIMITATION_OF_THE_POWER_BOOST: 100.0,
+    Xcom_API.PARA_REMOTE_ENTRY_ACTIVE: 1,
+}
+
+HEADER = struct.Struct('<BBIIH')
+SERVICE = struct.Struct('<BBHIH')
+
+
+class XtenderSimulator(object):
+    # latency: Verarbeitungszeit pro Transaktion in s, baudrate: Durchsatz der Antwort (0 = ungebremst)
+    # errors: {Fehlercode: Wahrscheinlichkeit}, drop_rate: Anteil der Requests ohne Antwort
+    def __init__(self, latency=0.0, baudrate=115200, errors=None, drop_rate=0.0, addresses=(101,), seed=None):
+        self.latency = latency
+        self.baudrate = baudrate
+        self.errors = dict(errors or {})
+        self.drop_rate = drop_rate
+        self.addresses = set(addresses)
+        self.random = random.Random(seed)
+        self.info = Xcom_API._Xcom_API__para_info_dict
+        self.parameters = {address: dict(PARAMETERS) for address in self.addresses}
+        self.transactions = 0
+        self.injected = 0
+        self.start_time = time.monotonic()
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.decoder = FrameDecoder()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self.port
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def serve_forever(self):
+        self.running = True
+        while self.running:
+            if not select.select([self.master], [], [], 0.1)[0]:
+                continue
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                return
+            for frame in self.decoder.feed(data):
+                # nur Requests beantworten (Data-Flags 0)
+                if frame[14] == 0:
+                    self.__answer(frame)
+
+    def value(self, address, object_id):
+        object_type, property_id, data_format = self.info[object_id]
+        if object_type == Xcom_API._object_type_parameter:
+            return self.parameters[address].get(object_id, 0.0 if data_format is Xcom_API._format_float else 0)
+        if data_format is not Xcom_API._format_float:
+            # Relais und Zustaende wechseln selten
+            return int(time.monotonic() - self.start_time) // 600 % 2
+        mean, amplitude, period = PROFILES.get(object_id, (1.0, 0.5, 60.0))
+        t = time.monotonic() - self.start_time
+        noise = self.random.uniform(-0.01, 0.01) * (amplitude or 1.0)
+        return float(mean + amplitude * math.sin(2 * math.pi * (t + address) / period) + noise)
+
+    def __answer(self, request):
+        self.transactions += 1
+        source, destination = struct.unpack_from('<II', request, 2)
+        flags, service, object_type, object_id, property_id = SERVICE.unpack_from(request, 14)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.drop_rate and self.random.random() < self.drop_rate:
+            self.injected += 1
+            return
+        for code, rate in self.errors.items():
+            if self.random.random() < rate:
+                self.injected += 1
+                return self.__send(destination, source, service, object_type, object_id, property_id, None, code)
+        if destination not in self.addresses:
+            return self.__send(destination, source, service, object_type, object_id, property_id, None, ERROR_DEVICE_NOT_FOUND)
+        if object_id not in self.info:
+            return self.__send(destination, source, service, object_type, object_id, property_id, None, ERROR_OBJECT_ID_NOT_FOUND)
+        data_format = self.info[object_id][2]
+        if service == 2:
+            if object_type != Xcom_API._object_type_parameter:
+                return self.__send(destination, source, service, object_type, object_id, property_id, None,
+                                   ERROR_PROPERTY_IS_READ_ONLY)
+            self.parameters[destination][object_id] = data_format.decode(request, 24)
+            return self.__send(destination, source, service, object_type, object_id, property_id, b'')
+        data = data_format.encode(self.value(destination, object_id))
+        return self.__send(destination, source, service, object_type, object_id, property_id, data)
+
+    def __send(self, source, destination, service, object_type, object_id, property_id, data, error=None):
+        checksum = Xcom_API._Xcom_API__calculate_checksum
+        if error is not None:
+            flags, data = 0x03, Xcom_API._format_error.encode(error)
+        else:
+            flags = 0x02
+        body = SERVICE.pack(flags, service, object_type, object_id, property_id) + data
+        header = HEADER.pack(0xAA, 0x00, source, destination, len(body))
+        frame = header + bytes(checksum(header, 1)) + body + bytes(checksum(body))
+        if self.baudrate:
+            # 8E1 = 11 Bit pro Byte auf der Leitung
+            time.sleep(len(frame) * 11.0 / self.baudrate)
+        os.write(self.master, frame)
+
+
+if __name__ == '__main__':
+    sim = XtenderSimulator()
+    print(sim.port)
+    try:
+        sim.serve_forever()
+    except KeyboardInterrupt:
+        pass
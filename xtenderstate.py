@@ -0,0 +1,100 @@
+#Modul xtenderstate, Poll-Liste und Datenhaltung fuer xtenderweb (Flask) und xtenderasgi, ohne Webframework
+#
+#   from xtenderstate import olist, init_poll_list, history, store, feed, cache, query_history
+#
+#XPollObjekt.update ist der Callback des PollScheduler und verteilt jeden Wert an Ringpuffer, SampleStore, ChangeFeed und Cache.
+
+from transport import ReadThrough
+from history import History
+from store import SampleStore
+from events import ChangeFeed
+import os
+import time
+
+olist = []
+history = History(span=86400.0)     # 24 h pro ID, Groesse nach refreshtime: 5 s -> 200 kB, 60 s -> 17 kB
+# alles aeltere, mit Rollups, Pfad ueber XTENDER_DB, die Datei entsteht erst mit store.start()
+store = SampleStore(os.environ.get("XTENDER_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'xtender.db')))
+feed = ChangeFeed()     # geaenderte Werte fuer /events
+# Rohwerte des Pollers fuer /value_by_id und /values, cache.read setzt das Frontend (Read ueber den Bus),
+# hoechstens 2 Reads pro s, damit HTTP Clients den Bus nicht zustopfen
+cache = ReadThrough(None, rate=2.0, burst=5)
+
+# id , zeit in s
+# mit deadband (Rohwert, vor a) passt der Poller die Zeit zwischen mintime und maxtime an die Aenderung des Werts an
+class XPollObjekt(object):
+    value = 1.0 #Speicher für die geholten werte
+    def __init__(self, id = 0, name = "name", unit = "", refreshtime = 0.0, a = 1.0, mintime = None, maxtime = None, deadband = None) -> None:
+        self.id = id
+        self.name = name
+        self.unit = unit
+        self.refreshtime = refreshtime
+        self.mintime = mintime
+        self.maxtime = maxtime
+        self.deadband = deadband
+        self.updatetime = time.time()
+        self.raw = 0.0
+        self.a = a
+        self.init = True
+    # Callback des PollScheduler
+    def update (self, item):
+        if item.ok:
+            self.raw = item.value
+            self.updatetime = item.timestamp
+            self.init = False
+            cache.put(self.id, self.raw, item.timestamp)
+            if isinstance(self.raw, (int, float)):
+                # Parameter (refreshtime 0) werden nur einmal gelesen und bekommen den kleinsten Puffer
+                history.append(self.id, item.timestamp, self.a * self.raw, self.refreshtime or history.span / history.min_capacity)
+                store.append(self.id, item.timestamp, self.a * self.raw)
+            feed.publish({self.key(): self.entry()})
+    def key (self):
+        return "id" + str(self.id)
+    # Eintrag wie in /list
+    def entry (self):
+        return {"value":self.value(),"name":self.name,"unit":self.unit}
+    def value (self):
+        return round (self.a * self.raw, 2)
+
+#Liste mit zu pollenden Xtender Objekten
+def init_poll_list(api):
+    olist.append(XPollObjekt(api.INFO_INPUT_VOLTAGE, "Netz-Eingangsspannung","V", 5.0, 1.0, 1.0, 30.0, 1.0))
+    olist.append(XPollObjekt(api.INFO_INPUT_CURRENT, "Netz-Eingangsstrom","A", 8.0, 1.0, 1.0, 30.0, 0.5))
+    olist.append(XPollObjekt(api.INFO_INPUT_POWER,   "Netz-Eingangsleistung","W", 10.0,1000.0, 1.0, 60.0, 0.05))
+    olist.append(XPollObjekt(api.INFO_BATTERY_VOLTAGE, "Batteriespannung","V", 10.0, 1.0, 2.0, 60.0, 0.1))
+    olist.append(XPollObjekt(api.INFO_OUTPUT_POWER, "Netz-Ausgangsleistung","W", 5.0, 1000.0, 1.0, 30.0, 0.05))
+    olist.append(XPollObjekt(api.INFO_OUTPUT_CURRENT, "Netz-Ausgangsstrom","A", 5.0, 1.0, 1.0, 30.0, 0.5))
+    olist.append(XPollObjekt(api.INFO_STATE_OF_OUTPUT_RELAY, "Status Ausgangsrelais","on/off", 60.0, 1.0, 5.0, 300.0, 0.0))
+    olist.append(XPollObjekt(api.INFO_STATE_OF_TRANSFER_RELAY, "Status Tranferrelais","on/off", 60.0, 1.0, 5.0, 300.0, 0.0))
+    olist.append(XPollObjekt(api.INFO_BATTERY_CHARGE_CURRENT, "Batterie Ladestrom","A", 60.0, 1.0, 5.0, 300.0, 0.5))
+
+
+def init_param_list(api):
+    olist.append(XPollObjekt(api.PARA_BATTERY_CHARGE_CURRENT, "Batterie Ladestrom","A", 0.0))
+
+
+# Verlauf aus Ringpuffer und SampleStore, from / to in ms
+# vor dem Beginn des Ringpuffers kommt der Store dazu, die points werden nach den tatsaechlich gelieferten Punkten aufgeteilt
+def query_history(id, t_from, t_to, points):
+    oldest = history.oldest(id)
+    if oldest is None or oldest > t_to:
+        return store.query(id, t_from, t_to, points)
+    new = history.query(id, max(t_from, oldest), t_to, points)
+    if t_from >= oldest:
+        return new
+    newest = store.newest(id)
+    if newest is None or newest < t_from:
+        return new
+    # nur bis zum letzten Wert im Store, nicht bis oldest - 1, sonst bestimmt eine leere Zeitspanne die Aufloesung
+    t_old = min(newest, oldest - 1)
+    old = store.query(id, t_from, t_old, points)
+    if not old["t"]:
+        return new
+    if len(old["t"]) + len(new["t"]) > points:
+        share = min(max(int(round(points * len(old["t"]) / (len(old["t"]) + len(new["t"])))), 1), points - 1) if points > 1 else 1
+        old = store.query(id, t_from, t_old, share)
+        new = history.query(id, max(t_from, oldest), t_to, max(points - share, 1))
+    old["resolution"] = max(old["resolution"], new["resolution"])
+    for k in ("t", "min", "max", "mean"):
+        old[k] = old[k] + new[k]
+    return old
@@ -1,41 +1,22 @@
-from flask import Flask, render_template, send_file, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 import xtender, threading, time
-import json
+from transport import PriorityScheduler, RateLimitError, PRIORITY_POLL, PRIORITY_INTERACTIVE
+from poller import PollScheduler
+from xtenderstate import olist, init_poll_list, init_param_list, store, feed, cache, query_history
+import atexit
+try:
+    # optional, WebSocket unter /ws mit denselben Nachrichten wie /events
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 
 #flask 
 app = Flask(__name__)
-olist = []
-
-# id , zeit in s
-class XPollObjekt(object):
-    value = 1.0 #Speicher für die geholten werte
-    def __init__(self, id = 0, name = "name", unit = "", refreshtime = 0.0, a = 1.0) -> None:
-        self.id = id
-        self.name = name
-        self.unit = unit
-        self.refreshtime = refreshtime
-        self.updatetime = time.time()
-        self.raw = 0.0
-        self.a = a
-        self.init = True
-    def value (self):
-        return round (self.a * self.raw, 2)
-
-#Liste mit zu pollenden Xtender Objekten
-def init_poll_list(api):
-    olist.append(XPollObjekt(api.INFO_INPUT_VOLTAGE, "Netz-Eingangsspannung","V", 5.0))
-    olist.append(XPollObjekt(api.INFO_INPUT_CURRENT, "Netz-Eingangsstrom","A", 8.0))
-    olist.append(XPollObjekt(api.INFO_INPUT_POWER,   "Netz-Eingangsleistung","W", 10.0,1000.0))
-    olist.append(XPollObjekt(api.INFO_BATTERY_VOLTAGE, "Batteriespannung","V", 10.0))
-    olist.append(XPollObjekt(api.INFO_OUTPUT_POWER, "Netz-Ausgangsleistung","W", 5.0, 1000.0))
-    olist.append(XPollObjekt(api.INFO_OUTPUT_CURRENT, "Netz-Ausgangsstrom","A", 5.0))
-    olist.append(XPollObjekt(api.INFO_STATE_OF_OUTPUT_RELAY, "Status Ausgangsrelais","on/off", 60.0))
-    olist.append(XPollObjekt(api.INFO_STATE_OF_TRANSFER_RELAY, "Status Tranferrelais","on/off", 60.0))
-    olist.append(XPollObjekt(api.INFO_BATTERY_CHARGE_CURRENT, "Batterie Ladestrom","A", 60.0))
-
-
-def init_param_list(api):
-    olist.append(XPollObjekt(api.PARA_BATTERY_CHARGE_CURRENT, "Batterie Ladestrom","A", 0.0))
+bus = None      # PriorityScheduler vor dem Xtender, Schreibzugriffe haben Vorrang vor dem Polling
+poller = None   # PollScheduler fuer olist
+# fehlende oder zu alte Werte fuer /value_by_id und /values werden mit Prioritaet interactive gelesen
+cache.read = lambda id: bus.read_id(id, PRIORITY_INTERACTIVE)
+
 
 
 '''
@@ -92,24 +73,25 @@ def init_param_list(api):
 
 
 def polling_thead():
+    global bus, poller
     Xtender = xtender.Xtender()
+    bus = PriorityScheduler(Xtender.conn)
     init_poll_list(Xtender.api)
     init_param_list(Xtender.api)
-    while (True):
-        i = 0
-        while  i < len(olist) :
-            o = olist[i]
-            if o.updatetime > 0:
-                if o.updatetime  < time.time():
-                    o.updatetime = time.time() + o.refreshtime
-                    o.raw = Xtender.conn.read_id(o.id)
-                    #print(time.time(), o.name, o.refreshtime, o.value , threading.get_ident())
-            else:
-                if o.init == True:
-                    o.raw = Xtender.conn.read_id(o.id)
-                    o.init = False
-            i += 1
-        time.sleep(0.2)
+    # Startwerte, damit /list von Anfang an alle Objekte enthaelt
+    feed.publish({o.key(): o.entry() for o in olist})
+    store.start()
+    atexit.register(store.close)
+    read_ids = getattr(Xtender.conn, "read_ids", None)
+    # budget: hoechstens 10 Reads pro s fuer das adaptive Polling, der Rest bleibt fuer Webanfragen und Schreibzugriffe
+    # ein Sweep ist ein Job im PriorityScheduler, max_sweep=4 haelt ihn kurz, ein Schreibzugriff wartet so hoechstens 4 Reads
+    poller = PollScheduler(lambda id: bus.read_id(id, PRIORITY_POLL),
+                           (lambda ids: bus.submit(PRIORITY_POLL, read_ids, ids)) if read_ids is not None else None,
+                           max_sweep=4, budget=10.0)
+    for o in olist:
+        # refreshtime 0 -> nur einmal lesen (Parameter)
+        poller.add(o.id, o.refreshtime or None, o.update, min_interval=o.mintime, max_interval=o.maxtime, deadband=o.deadband)
+    poller.run()
 
 
 
@@ -145,12 +127,71 @@ def status1(path):
     return render_template("static", path)
 '''
 
+# der Body wird pro Generation nur einmal erzeugt (JSON und gzip), ETag ist die Generation,
+# /list?since=<gen> liefert nur die Eintraege, die sich nach dieser Generation geaendert haben (Generation im Header X-Generation)
 @app.route('/list') 
 def list():
-    b = {}
-    for obj in olist:
-        b.update({"id"+str(obj.id) : {"value":obj.value(),"name":obj.name,"unit":obj.unit}})
-    return jsonify(b)
+    since = request.args.get("since", type = int)
+    generation, body, compressed = feed.document(since)
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+    tag = "g%d" % generation + ("-s%d" % since if since is not None else "") + ("-gz" if gzipped else "")
+    if request.if_none_match.contains(tag):
+        response = Response(status = 304)
+    else:
+        response = Response(compressed if gzipped else body, mimetype = "application/json")
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(tag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['X-Generation'] = str(generation)
+    return response
+
+
+# Server-Sent Events: zuerst der komplette Stand, danach nur geaenderte Werte mit der Generation als Event-ID,
+# nach einem Reconnect schickt der Browser Last-Event-ID und bekommt nur die verpassten Aenderungen
+@app.route('/events')
+def events():
+    last = request.headers.get("Last-Event-ID") or request.args.get("since")
+    response = Response(feed.stream(last), mimetype="text/event-stream")
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+if Sock is not None:
+    sock = Sock(app)
+
+    @sock.route('/ws')
+    def ws(ws):
+        since = request.args.get("since", type = int)
+        for message in feed.messages(since):
+            ws.send(message)
+
+
+# Latenzen, Fehler und Busauslastung des Transports, dazu die Wartezeiten im Scheduler
+@app.route('/metrics')
+def metrics():
+    if bus is None:
+        return jsonify({})
+    objects = request.args.get("objects", default = 0, type = int) == 1
+    # ueber XCOM_BROKER gibt es keine Busmetriken im Prozess, die hat der Broker
+    metrics = getattr(bus.conn, "metrics", None)
+    return jsonify({"bus": metrics.snapshot(objects) if metrics is not None else {}, "scheduler": bus.stats(),
+                    "poller": poller.stats() if poller is not None else {}, "store": store.stats(), "events": feed.stats(),
+                    "cache": cache.stats()})
+
+
+# Verlauf einer ID, from / to in ms seit 1970 (Default: die letzte Stunde), reduziert auf points Intervalle mit min / max / mean
+# Zeitraeume, die vor dem Ringpuffer beginnen, kommen aus dem SampleStore (Rohwerte oder Rollups)
+@app.route('/history')
+def f_history():
+    id = request.args.get("id", default = 3011, type = int)
+    t_to = request.args.get("to", default = int(time.time() * 1000), type = int)
+    t_from = request.args.get("from", default = t_to - 3600 * 1000, type = int)
+    points = min(max(request.args.get("points", default = 500, type = int), 1), 5000)
+    return jsonify(query_history(id, t_from, t_to, points))
+
+
 
 
 @app.route( "/u_eingang" )
@@ -158,12 +199,45 @@ def f_u_eingang():
     return jsonify( {"u_eingang": olist[0].value} )
 
 
+# Rohwert einer ID aus dem Cache, wenn er nicht aelter als max_age s ist, sonst ein Read ueber den Bus
 @app.route( "/value_by_id" )
 def f_value_by_id():
     id =  request.args.get("id", default = 3000, type = int)
+    max_age = request.args.get("max_age", default = 5.0, type = float)
     j = "id_" + str(id)
-    print(id)
-    return jsonify( {j: xtender.read_id(id)} )
+    if bus is None:
+        return jsonify( {j: None, "error": "bus not started"} ), 503
+    try:
+        value, timestamp = cache.get(id, max_age)
+    except RateLimitError as e:
+        return jsonify( {j: None, "error": str(e)} ), 429, {"Retry-After": "1"}
+    except Exception as e:
+        return jsonify( {j: None, "error": repr(e)} ), 503
+    return jsonify( {j: value, "age": round(time.time() - timestamp, 3)} )
+
+
+# mehrere IDs, z.B. /values?ids=3000,3011&max_age=10, Fehler einzelner IDs stehen unter "errors"
+@app.route( "/values" )
+def f_values():
+    try:
+        ids = [int(i) for i in request.args.get("ids", default = "").split(",") if i.strip()]
+    except ValueError:
+        return jsonify( {"error": "ids must be numbers"} ), 400
+    if len(ids) > 32:
+        return jsonify( {"error": "at most 32 ids"} ), 400
+    max_age = request.args.get("max_age", default = 5.0, type = float)
+    if bus is None:
+        return jsonify( {"error": "bus not started"} ), 503
+    values = {}
+    errors = {}
+    for id in dict.fromkeys(ids):
+        try:
+            values["id_" + str(id)] = cache.get(id, max_age)[0]
+        except Exception as e:
+            errors["id_" + str(id)] = str(e) if isinstance(e, RateLimitError) else repr(e)
+    if errors:
+        values["errors"] = errors
+    return jsonify(values)
 
 
 